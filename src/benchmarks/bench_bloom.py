@@ -0,0 +1,101 @@
+# Add/contains throughput of BloomFilter: the previous md5-per-probe filter vs double hashing over a bytearray,
+# then the false-positive rate of a hand-sized, an auto-sized and a scalable filter as the catalog grows,
+# then how a plain and a counting filter hold up when the whole catalog is replaced by deletes and adds
+# Run from src/: python -m benchmarks.bench_bloom [sizes...]
+import hashlib
+import sys
+import time
+from benchmarks.bench_tries import make_products
+from utilities.bloom_filter import BloomFilter, CountingBloomFilter, ScalableBloomFilter
+
+DEFAULT_SIZES = [2_000, 100_000]
+HASH_COUNT = 3
+FP_RATE = 0.01
+
+class Md5BloomFilter:  # The filter before double hashing, one md5 + hex round trip per probe and a list of bits
+    def __init__(self, size: int, hash_count: int):
+        self.size = size
+        self.hash_count = hash_count
+        self.bit_array = [0] * size
+
+    def _hash(self, item: str, seed: int):
+        return int(hashlib.md5(f"{item}{seed}".encode()).hexdigest(), 16) % self.size
+
+    def add(self, item: str):
+        item = item.lower()
+        for i in range(self.hash_count):
+            self.bit_array[self._hash(item, i)] = 1
+
+    def contain(self, item: str):
+        item = item.lower()
+        for i in range(self.hash_count):
+            if self.bit_array[self._hash(item, i)] == 0:
+                return False
+        return True
+
+def per_second(action, items):
+    start = time.perf_counter()
+    action(items)
+    return len(items) / (time.perf_counter() - start)
+
+def main(sizes):
+    print(f"{'Names':>10} {'Filter':>14} {'add/s':>12} {'contains/s':>12} {'FP rate':>8}")
+    print("-" * 60)
+    for size in sizes:
+        names = [product.name for product in make_products(size)]
+        absent = [name + " x" for name in names]  # Never added, every hit is a false positive
+        filters = (
+            ("md5 per probe", Md5BloomFilter(size * 10, HASH_COUNT),
+             lambda f, items: [f.add(item) for item in items],
+             lambda f, items: [f.contain(item) for item in items]),
+            ("double hash", BloomFilter(size * 10, HASH_COUNT),
+             lambda f, items: [f.add(item) for item in items],
+             lambda f, items: [f.contain(item) for item in items]),
+            ("  add_many", BloomFilter(size * 10, HASH_COUNT),
+             lambda f, items: f.add_many(items),
+             lambda f, items: f.contains_many(items)),
+        )
+        for label, bloom, add, contains in filters:
+            adds = per_second(lambda items: add(bloom, items), names)
+            lookups = per_second(lambda items: contains(bloom, items), names + absent)
+            assert all(contains(bloom, names)), f"{label} lost an added name"
+            false_positives = sum(contains(bloom, absent)) / len(absent)
+            print(f"{size:>10} {label:>14} {adds:>12.0f} {lookups:>12.0f} {false_positives:>8.2%}")
+
+def sizing(sizes):  # Measured false-positive rate, the filter's own estimate in brackets
+    print(f"\n{'Names':>10} {'size=1000, k=3':>20} {'for_capacity':>20} {'scalable from 1000':>20}")
+    print("-" * 74)
+    for size in sizes:
+        names = [product.name for product in make_products(size)]
+        absent = [name + " x" for name in names]
+        columns = []
+        for bloom in (BloomFilter(1000, HASH_COUNT), BloomFilter.for_capacity(size, FP_RATE),
+                      ScalableBloomFilter(1000, FP_RATE)):
+            bloom.add_many(names)
+            measured = sum(bloom.contains_many(absent)) / len(absent)
+            columns.append(f"{measured:.2%} ({bloom.false_positive_rate():.2%})")
+        print(f"{size:>10} {columns[0]:>20} {columns[1]:>20} {columns[2]:>20}")
+
+def churn(sizes, rounds: int = 3):  # Each round deletes every name and adds as many new ones
+    print(f"\n{'Names':>10} {'Round':>6} {'plain FP':>10} {'counting FP':>12} {'counters (KB)':>14}")
+    print("-" * 56)
+    for size in sizes:
+        plain, counting = BloomFilter.for_capacity(size, FP_RATE), CountingBloomFilter.for_capacity(size, FP_RATE)
+        names = [product.name for product in make_products(size)]
+        plain.add_many(names)
+        counting.add_many(names)
+        absent = [f"{name} absent" for name in names]
+        for round_number in range(1, rounds + 1):
+            for name in names:
+                counting.remove(name)  # A plain filter can only forget by being rebuilt
+            names = [f"{name} r{round_number}" for name in names]
+            plain.add_many(names)
+            counting.add_many(names)
+            rates = [sum(bloom.contains_many(absent)) / len(absent) for bloom in (plain, counting)]
+            print(f"{size:>10} {round_number:>6} {rates[0]:>10.2%} {rates[1]:>12.2%} {len(counting.counters) / 1024:>14.1f}")
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES
+    main(sizes)
+    sizing(sizes)
+    churn(sizes)
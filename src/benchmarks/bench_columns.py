@@ -0,0 +1,71 @@
+# Whole-catalog report queries answered by looping over Product objects vs ProductColumns, with the
+# builtin array path and, when it is installed, the NumPy path.
+# Run from src/: python -m benchmarks.bench_columns [sizes...]
+import random
+import sys
+import time
+from datetime import date
+import utilities.product_columns as product_columns
+from models.product import Product
+from utilities.product_columns import ProductColumns
+
+DEFAULT_SIZES = [20_000, 1_000_000]
+CATEGORIES = ["Food", "Books", "Toys", "Tools", "Beauty", "Sports", "Clothing", "Electronics"]
+REPEATS = 5
+
+def make_catalog(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    start = date(2026, 1, 1).toordinal()
+    products, ordinals = [], []
+    for i in range(count):
+        ordinal = start + rng.randrange(730)
+        products.append(Product(f"C{i}", f"Item {i}", round(rng.uniform(100, 50_000), 2), rng.randint(0, 500),
+                                date.fromordinal(ordinal).isoformat(), f"Supplier{rng.randrange(200)}",
+                                rng.choice(CATEGORIES)))
+        ordinals.append(ordinal)
+    return products, ordinals
+
+def loop_queries(products, ordinals, low, week):  # What a report does with only the product list
+    value = sum(p.quantity * p.unit_price for p in products)
+    low_count = sum(1 for p in products if p.quantity < low)
+    breakdown = {}
+    for p in products:
+        totals = breakdown.setdefault(p.category, [0, 0, 0.0])
+        totals[0] += 1
+        totals[1] += p.quantity
+        totals[2] += p.quantity * p.unit_price
+    expiring = sum(p.quantity * p.unit_price for p, ordinal in zip(products, ordinals) if week[0] <= ordinal <= week[1])
+    food_low = [p for p in products if p.category == "Food" and p.quantity < low]
+    return value, low_count, breakdown, expiring, food_low
+
+def column_queries(columns, low, week):
+    return (columns.stock_value(), columns.count(quantity_below=low), columns.breakdown("category"),
+            columns.stock_value(expiring_from=week[0], expiring_to=week[1]),
+            columns.select(category="Food", quantity_below=low))
+
+def timed(query):  # Best of REPEATS, milliseconds
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        query()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def main(sizes):
+    numpy = product_columns.numpy
+    print(f"{'Products':>10} {'Product loop (ms)':>18} {'array columns (ms)':>19} {'NumPy columns (ms)':>19}")
+    print("-" * 70)
+    for size in sizes:
+        products, ordinals = make_catalog(size)
+        columns = ProductColumns()
+        columns.build(products, ordinals)
+        low, week = 30, (ordinals[0], ordinals[0] + 7)
+        loop = timed(lambda: loop_queries(products, ordinals, low, week))
+        product_columns.numpy = None
+        builtin = timed(lambda: column_queries(columns, low, week))
+        product_columns.numpy = numpy
+        vectorized = f"{timed(lambda: column_queries(columns, low, week)):>19.2f}" if numpy is not None else f"{'not installed':>19}"
+        print(f"{size:>10} {loop:>18.2f} {builtin:>19.2f} {vectorized}")
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
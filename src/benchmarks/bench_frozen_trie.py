@@ -0,0 +1,46 @@
+# Prefix lookups per second: live Trie vs the DoubleArrayTrie compiled from it
+# Run from src/: python -m benchmarks.bench_frozen_trie [sizes...]
+import random
+import sys
+import time
+from benchmarks.bench_tries import make_products
+from utilities.double_array_trie import DoubleArrayTrie
+from utilities.trie import Trie
+
+DEFAULT_SIZES = [2_000, 100_000]
+LOOKUPS = 20_000
+ROWS = 10  # Like an autocomplete list, only the first rows are taken
+
+def lookups_per_second(search, prefixes, *args):
+    start = time.perf_counter()
+    for prefix in prefixes:
+        search(prefix, *args)
+    return len(prefixes) / (time.perf_counter() - start)
+
+def main(sizes):
+    # "walk" only follows the prefix, "rows" also collects the first ROWS products like the autocomplete list
+    print(f"{'Names':>10} {'Compile (s)':>12} {'Trie walk/s':>12} {'Frozen walk/s':>14} "
+          f"{'Trie rows/s':>12} {'Frozen rows/s':>14}")
+    print("-" * 80)
+    for size in sizes:
+        products = make_products(size)
+        trie = Trie()
+        for product in products:
+            trie.insert(product)
+        start = time.perf_counter()
+        frozen = DoubleArrayTrie.compile(trie)
+        compile_seconds = time.perf_counter() - start
+
+        rng = random.Random(size)
+        prefixes = [rng.choice(products).name.lower()[:rng.randint(1, 8)] for _ in range(LOOKUPS)]
+        for prefix in prefixes[:200]:
+            assert frozen.search_prefix(prefix, ROWS) == trie.search_prefix(prefix, ROWS)
+
+        print(f"{size:>10} {compile_seconds:>12.2f} "
+              f"{lookups_per_second(trie._find_node, prefixes):>12.0f} "
+              f"{lookups_per_second(frozen._find_state, prefixes):>14.0f} "
+              f"{lookups_per_second(trie.search_prefix, prefixes, ROWS):>12.0f} "
+              f"{lookups_per_second(frozen.search_prefix, prefixes, ROWS):>14.0f}")
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
@@ -0,0 +1,61 @@
+# Cost of persisting one sale: rewriting the whole JSON (save_products before journaling) vs appending to the journal,
+# how long the caller waits when saves run on the background worker, and a single-row UPDATE in SQLite storage
+# Run from src/: python -m benchmarks.bench_journal [sizes...]
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from benchmarks.bench_tries import make_products
+from utilities.inventory_manager import InventoryManager
+from utilities.storage import SqliteStorage, migrate_json_to_sqlite
+
+DEFAULT_SIZES = [2_000, 100_000]
+SALES = 200
+
+def sales_per_second(inventory, rng):
+    products = [p for p in inventory.products if p.quantity > 0]
+    inventory.flush()  # Lets the frozen trie compile and snapshot write of the load finish, only the sales are timed
+    start = time.perf_counter()
+    for _ in range(SALES):
+        product = rng.choice(products)
+        if product.quantity:
+            inventory.update_product_quantity(product, 1)
+        inventory.save_products()
+    return SALES / (time.perf_counter() - start)
+
+def main(sizes):
+    print(f"{'Products':>10} {'Rewrite (sales/s)':>18} {'Journal (sales/s)':>18} {'Background (sales/s)':>21} "
+          f"{'SQLite (sales/s)':>17} {'Checkpoint (s)':>15}")
+    print("-" * 106)
+    workdir = tempfile.mkdtemp()
+    try:
+        for size in sizes:
+            source = os.path.join(workdir, "stock.json")
+            with open(source, "w") as f:
+                json.dump({"metadata": {}, "products": [p.to_dict() for p in make_products(size)]}, f)
+            rng = random.Random(5)
+            rates = []
+            for journaled, background in ((False, False), (True, False), (False, True)):
+                inventory = InventoryManager(source, journaled=journaled, background=background)
+                rates.append(sales_per_second(inventory, rng))
+                inventory.close()
+            database = os.path.join(workdir, f"stock{size}.db")
+            migrate_json_to_sqlite(source, database)
+            inventory = InventoryManager(database, storage=SqliteStorage(database))
+            rates.append(sales_per_second(inventory, rng))
+            inventory.close()
+            inventory = InventoryManager(source, journaled=True)
+            start = time.perf_counter()
+            inventory.checkpoint()
+            checkpoint = time.perf_counter() - start
+            inventory.close()
+            print(f"{size:>10} {rates[0]:>18.1f} {rates[1]:>18.1f} {rates[2]:>21.1f} {rates[3]:>17.1f} "
+                  f"{checkpoint:>15.2f}")
+    finally:
+        shutil.rmtree(workdir)
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
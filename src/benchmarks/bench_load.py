@@ -0,0 +1,66 @@
+# Time and peak memory of turning a stored catalog into Product objects, per storage format: json.load on the
+# whole document (the loader before streaming), JsonStorage (streamed), BinaryStorage and SqliteStorage.
+# "Catalog" is what the Products themselves keep once loading is done, the floor every loader is measured against.
+# Run from src/: python -m benchmarks.bench_load [sizes...]
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from benchmarks.bench_tries import make_products
+from models.product import Product
+from utilities.storage import convert, storage_for
+
+DEFAULT_SIZES = [20_000, 200_000]
+
+def to_product(row):
+    return Product(row["product_id"], row["name"], row["unit_price"], row["quantity_in_stock"],
+                   row["expiry_date"], row["supplier"], row.get("category", ""))
+
+def load_whole(path):
+    with open(path, "r") as f:
+        return [to_product(row) for row in json.load(f).get("products", [])]
+
+def load_storage(path):
+    storage = storage_for(path)
+    try:
+        return [to_product(row) for row in storage.load()]
+    finally:
+        storage.close()
+
+def measure(loader, path):  # (seconds, peak bytes, bytes still held by the result)
+    start = time.perf_counter()
+    loader(path)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    products = loader(path)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del products
+    return elapsed, peak, current
+
+def main(sizes):
+    print(f"{'Products':>10} {'Format':>14} {'File (MB)':>10} {'Load (s)':>9} {'Peak (MB)':>10} {'Catalog (MB)':>13}")
+    print("-" * 71)
+    mb = 1024 * 1024
+    workdir = tempfile.mkdtemp()
+    try:
+        for size in sizes:
+            source = os.path.join(workdir, "stock.json")
+            with open(source, "w") as f:
+                json.dump({"metadata": {}, "products": [p.to_dict() for p in make_products(size)]}, f, indent=2)
+            paths = {"json.load": source, "JSON streamed": source}
+            for name, extension in (("binary", ".invc"), ("SQLite", ".db")):
+                paths[name] = os.path.join(workdir, f"stock{size}{extension}")
+                convert(source, paths[name])
+            for name, path in paths.items():
+                elapsed, peak, catalog = measure(load_whole if name == "json.load" else load_storage, path)
+                print(f"{size:>10} {name:>14} {os.path.getsize(path) / mb:>10.1f} {elapsed:>9.2f} {peak / mb:>10.1f} "
+                      f"{catalog / mb:>13.1f}")
+    finally:
+        shutil.rmtree(workdir)
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
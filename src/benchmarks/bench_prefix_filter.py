@@ -0,0 +1,70 @@
+# Autocomplete cost per keystroke with and without the PrefixBloomFilter in front of the cache and trie.
+# The trace types catalog names one key at a time; a share of them get a typo part way through, after which
+# every keystroke is a prefix nothing starts with (the miss path the filter short-circuits).
+# Run from src/: python -m benchmarks.bench_prefix_filter [sizes...]
+import random
+import sys
+import time
+from itertools import islice
+from benchmarks.bench_tries import make_products
+from utilities.bloom_filter import PrefixBloomFilter
+from utilities.prefix_cache import PrefixCache
+from utilities.trie import Trie
+
+DEFAULT_SIZES = [2_000, 100_000]
+SEARCHES = 2_000  # Names typed per trace
+TYPO_RATE = 0.3  # Share of typed names with a wrong key
+ROWS = 10
+
+def keystroke_trace(products, rng):  # Successive search box contents, a fresh search starts after each name
+    trace = []
+    for product in rng.sample(products, min(SEARCHES, len(products))):
+        name = product.name.lower()
+        if rng.random() < TYPO_RATE:
+            slip = rng.randrange(1, min(len(name), 6))
+            name = name[:slip] + rng.choice("qxzj") + name[slip + 1:]
+        trace.extend(name[:end] for end in range(1, min(len(name), 12) + 1))
+    return trace
+
+def autocomplete(trie, cache, prefix_filter, prefix):  # The InventoryManager.iter_autocomplete read path
+    if prefix_filter is not None and not prefix_filter.contain(prefix):
+        return []
+    cached = cache.lookup(prefix)
+    if cached is not None:
+        return cached[:ROWS]
+    head = list(islice(trie.iter_prefix(prefix), ROWS + 1))  # The page, plus the read that finds the end
+    if len(head) <= ROWS:  # Read whole, small enough to cache
+        cache.store(prefix, head)
+    return head[:ROWS]
+
+def run(trie, prefix_filter, trace, matching):  # Microseconds per keystroke: all, hits, misses
+    cache = PrefixCache()
+    timings = {True: 0.0, False: 0.0}
+    for prefix in trace:
+        start = time.perf_counter()
+        autocomplete(trie, cache, prefix_filter, prefix)
+        timings[prefix in matching] += time.perf_counter() - start
+    hits = sum(prefix in matching for prefix in trace)
+    return (sum(timings.values()) / len(trace) * 1e6, timings[True] / max(hits, 1) * 1e6,
+            timings[False] / max(len(trace) - hits, 1) * 1e6)
+
+def main(sizes):
+    print(f"{'Names':>10} {'Keystrokes':>11} {'Misses':>7} {'Filter':>7} {'all (us)':>9} {'hit (us)':>9} {'miss (us)':>10}")
+    print("-" * 70)
+    rng = random.Random(3)
+    for size in sizes:
+        products = make_products(size)
+        trie = Trie()
+        for product in products:
+            trie.insert(product)
+        prefix_filter = PrefixBloomFilter.for_names([product.name for product in products])
+        trace = keystroke_trace(products, rng)
+        matching = {prefix for prefix in set(trace) if trie._find_node(prefix) is not None}
+        assert all(prefix_filter.contain(prefix) for prefix in matching), "prefix filter lost a prefix"
+        misses = sum(prefix not in matching for prefix in trace)
+        for label, active in (("off", None), ("on", prefix_filter)):
+            total, hit, miss = run(trie, active, trace, matching)
+            print(f"{size:>10} {len(trace):>11} {misses:>7} {label:>7} {total:>9.2f} {hit:>9.2f} {miss:>10.2f}")
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
@@ -0,0 +1,53 @@
+# Cold-start cost of the search indexes: building Trie + BloomFilter vs opening the mmapped snapshot
+# Run from src/: python -m benchmarks.bench_snapshot [sizes...]
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from benchmarks.bench_tries import make_products
+from utilities.bloom_filter import CountingBloomFilter
+from utilities.index_snapshot import IndexSnapshot, write_snapshot
+from utilities.trie import Trie
+
+DEFAULT_SIZES = [2_000, 100_000, 1_000_000]
+
+def main(sizes):
+    print(f"{'Products':>10} {'Build (s)':>10} {'Snapshot (MB)':>14} {'Open (ms)':>10} {'1st search (ms)':>16}")
+    print("-" * 64)
+    workdir = tempfile.mkdtemp()
+    try:
+        for size in sizes:
+            products = make_products(size)
+            source = os.path.join(workdir, "stock.json")
+            with open(source, "w") as f:
+                json.dump({"products": [p.to_dict() for p in products]}, f)
+
+            start = time.perf_counter()
+            trie, bloom = Trie(), CountingBloomFilter(size=size * 10, hash_count=3)
+            for product in products:
+                trie.insert(product)
+                bloom.add(product.name)
+            build = time.perf_counter() - start
+
+            path = source + ".idx"
+            write_snapshot(path, source, trie, bloom, products)
+            del trie, bloom
+
+            start = time.perf_counter()
+            snapshot = IndexSnapshot.open_if_valid(path, source)
+            opened = time.perf_counter() - start
+            start = time.perf_counter()
+            matches = [products[i] for i, _ in zip(snapshot.iter_prefix("sc"), range(50))]
+            first_search = time.perf_counter() - start
+            assert matches and snapshot.contain(products[0].name)
+
+            print(f"{size:>10} {build:>10.2f} {os.path.getsize(path) / 1e6:>14.1f} "
+                  f"{opened * 1000:>10.2f} {first_search * 1000:>16.2f}")
+            snapshot.close()
+    finally:
+        shutil.rmtree(workdir)
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
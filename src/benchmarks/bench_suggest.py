@@ -0,0 +1,44 @@
+# Memory and build-time report of the "did you mean" index, plus lookup latency.
+# Synthetic names share ~200 base words, so lookups verify far more candidates than on data.json
+# Run from src/: python -m benchmarks.bench_suggest [sizes...]
+import random
+import sys
+import time
+from benchmarks.bench_tries import make_products
+from utilities.spell_index import SymmetricDeleteIndex
+
+DEFAULT_SIZES = [2_000, 20_000]
+LOOKUPS = 1_000
+
+def misspell(name: str, rng):  # One random substitution, deletion or swap, the usual cashier typos
+    i = rng.randrange(len(name))
+    kind = rng.choice(("substitute", "delete", "swap"))
+    if kind == "substitute":
+        return name[:i] + rng.choice("abcdefghijklmnopqrstuvwxyz") + name[i + 1:]
+    if kind == "delete" and len(name) > 1:
+        return name[:i] + name[i + 1:]
+    if i + 1 < len(name):
+        return name[:i] + name[i + 1] + name[i] + name[i + 2:]
+    return name
+
+def main(sizes):
+    print(f"{'Names':>10} {'Variants':>12} {'Memory (MB)':>12} {'Build (s)':>10} {'Lookup (us)':>12}")
+    print("-" * 60)
+    for size in sizes:
+        products = make_products(size)
+        index = SymmetricDeleteIndex(max_distance=2)
+        index.build(products)
+        report = index.report()
+
+        rng = random.Random(size)
+        queries = [misspell(rng.choice(products).name.lower(), rng) for _ in range(LOOKUPS)]
+        start = time.perf_counter()
+        for query in queries:
+            index.lookup(query)
+        latency = (time.perf_counter() - start) / LOOKUPS * 1e6
+
+        print(f"{size:>10} {report['variants']:>12} {report['memory_bytes'] / 1e6:>12.1f} "
+              f"{report['build_seconds']:>10.2f} {latency:>12.1f}")
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
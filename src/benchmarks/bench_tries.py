@@ -0,0 +1,60 @@
+# Compares memory and prefix lookup latency of Trie and RadixTrie
+# Run from src/: python -m benchmarks.bench_tries [sizes...]
+import json
+import random
+import sys
+import time
+import tracemalloc
+from models.product import Product
+from utilities.radix_trie import RadixTrie
+from utilities.trie import Trie
+
+DEFAULT_SIZES = [2_000, 100_000, 1_000_000]
+LOOKUPS = 2_000
+
+def make_products(count: int, seed: int = 42):  # Catalog names padded with brand/size words to reach count unique names
+    with open("../data.json", "r") as f:
+        base = [p["name"] for p in json.load(f)["products"]]
+    words = ["Pro", "Max", "Mini", "Eco", "Plus", "Lite", "Ultra", "Classic", "Deluxe", "Basic"]
+    rng = random.Random(seed)
+    products = []
+    for i in range(count):
+        name = f"{rng.choice(base)} {rng.choice(words)} {i:x}" if i >= len(base) else base[i]
+        products.append(Product(f"B{i}", name, 100.0, rng.randint(0, 500), "2026-12-31", "Bench"))
+    return products
+
+def build(trie_class, products):  # Returns (structure, bytes allocated while building it, seconds)
+    tracemalloc.start()
+    start = time.perf_counter()
+    trie = trie_class()
+    for product in products:
+        trie.insert(product)
+    elapsed = time.perf_counter() - start
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return trie, memory, elapsed
+
+def lookup_latency(trie, prefixes):  # Mean microseconds per search_prefix call
+    start = time.perf_counter()
+    for prefix in prefixes:
+        trie.search_prefix(prefix)
+    return (time.perf_counter() - start) / len(prefixes) * 1e6
+
+def main(sizes):
+    print(f"{'Names':>10} {'Structure':<10} {'Memory (MB)':>12} {'Build (s)':>10} {'Lookup (us)':>12}")
+    print("-" * 58)
+    for size in sizes:
+        products = make_products(size)
+        rng = random.Random(size)
+        prefixes = []
+        for _ in range(LOOKUPS):  # Prefixes long enough to be selective, like a cashier mid-word
+            name = rng.choice(products).name.lower()
+            prefixes.append(name[:rng.randint(min(4, len(name)), len(name))])
+        for trie_class in (Trie, RadixTrie):
+            trie, memory, elapsed = build(trie_class, products)
+            latency = lookup_latency(trie, prefixes)
+            print(f"{size:>10} {trie_class.__name__:<10} {memory / 1e6:>12.1f} {elapsed:>10.2f} {latency:>12.1f}")
+            del trie
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
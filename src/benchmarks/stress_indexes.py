@@ -0,0 +1,119 @@
+# Interleaves adds, deletes, renames, sales and searches on an InventoryManager and checks every
+# search index against a brute-force scan of the product list after each step.
+# Run from src/: python -m benchmarks.stress_indexes [operations] [seed]
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+from models.product import Product
+from utilities.inventory_manager import InventoryManager
+from utilities.inventory_stats import InventoryStats
+
+LETTERS = "abcdefghijklmnopqrstuvwxyz"
+
+def random_name(rng):
+    return "".join(rng.choice(LETTERS[:8]) for _ in range(rng.randint(1, 6))).capitalize()  # Small alphabet, lots of shared prefixes
+
+def check(inventory, rng):  # Every index must agree with a linear scan over inventory.products
+    by_name = {}
+    for product in inventory.products:
+        by_name.setdefault(product.name.lower(), []).append(product)
+
+    prefix = random_name(rng)[:rng.randint(1, 3)].lower()
+    expected = sorted(p.product_id for p in inventory.products if p.name.lower().startswith(prefix))
+    found = sorted(p.product_id for p in inventory.search_with_autocomplete(prefix))
+    assert found == expected, f"trie mismatch for '{prefix}'"
+    if inventory.frozen_trie is not None and not inventory._frozen_stale:
+        found = sorted(p.product_id for p in inventory.frozen_trie.search_prefix(prefix))
+        assert found == expected, f"frozen trie mismatch for '{prefix}'"
+
+    term = random_name(rng)[:rng.randint(1, 4)].lower()
+    expected = [p for p in inventory.products if term in p.name.lower() or term in p.category.lower() or term in p.product_id.lower()]
+    assert set(inventory.search_substring(term)) == set(expected), f"substring index mismatch for '{term}'"
+
+    for name, products in by_name.items():
+        assert inventory.bloom_filter.contain(name), f"bloom filter lost '{name}'"
+        assert inventory.prefix_filter.contain(name[:rng.randint(1, len(name))]), f"prefix filter lost a prefix of '{name}'"
+        assert set(inventory.suggest(name, max_distance=0)) == set(products), f"suggestions mismatch for '{name}'"
+    assert set(inventory._lazy_index("spell_index").products) == set(by_name), "spell index keeps deleted names"
+    phonetic_index = inventory._lazy_index("phonetic_index")
+    assert sum(map(len, phonetic_index.codes.values())) == len(inventory.products), "phonetic index drifted"
+    assert all(p in inventory.search_phonetic(p.name) for p in inventory.products), "phonetic index lost a product"
+    assert len(inventory.products_by_id) == len(inventory.products), "ID index drifted"
+    assert all(inventory.get(p.product_id) is p and inventory.products[inventory._positions[p.product_id]] is p
+               for p in inventory.products), "ID index points at the wrong product"
+    views = {"expiry": lambda p: p.expiry_date, "name": lambda p: p.name, "stock": lambda p: p.quantity, "price": lambda p: p.unit_price}
+    for sort_by, key in views.items():
+        view = list(inventory.sorted_products(sort_by))
+        assert sorted(map(id, view)) == sorted(map(id, inventory.products)), f"{sort_by} view lost or kept products"
+        assert list(map(key, view)) == sorted(map(key, inventory.products)), f"{sort_by} view out of order"
+    expected_stats = InventoryStats(inventory.low_stock_threshold)
+    expected_stats.build(inventory.products)
+    assert inventory.statistics() == expected_stats.as_dict(), "statistics drifted"
+    columns = inventory.columns
+    assert (list(columns.quantity), list(columns.unit_price), list(columns.expiry)) == (
+        [p.quantity for p in inventory.products], [p.unit_price for p in inventory.products],
+        [inventory.expiry_ordinals[p.product_id] for p in inventory.products]), "columns drifted"
+    assert [columns.category_values[code] for code in columns.category] == [p.category for p in inventory.products] and \
+        [columns.supplier_values[code] for code in columns.supplier] == [p.supplier for p in inventory.products], \
+        "category or supplier codes drifted"
+    bloom = inventory.bloom_filter
+    counters = [bloom.counter(i) for i in range(bloom.size)]
+    if bloom.MAX_COUNT not in counters:  # Saturated counters stop counting
+        assert sum(counters) == len(inventory.products) * bloom.hash_count, "bloom counters drifted"
+    assert all(bool(counter) == bool(bloom.bits[i >> 3] & (1 << (i & 7))) for i, counter in enumerate(counters)), "bloom bits drifted"
+    name = random_name(rng)
+    assert inventory.has_product_named(name) == (name.lower() in by_name), f"name check wrong for '{name}'"
+
+def main(operations: int = 2000, seed: int = 7):
+    rng = random.Random(seed)
+    workdir = tempfile.mkdtemp()
+    try:
+        json_file = os.path.join(workdir, "stock.json")
+        with open(json_file, "w") as f:  # Deletes save the catalog, so work on a throwaway copy
+            json.dump({"metadata": {}, "products": []}, f)
+        inventory = InventoryManager(json_file, journaled=True, background=True)  # Saves race the edits below
+        next_id = 0
+
+        for step in range(operations):
+            action = rng.random()
+            if action < 0.4 or not inventory.products:
+                next_id += 1
+                inventory.add_product(Product(f"S{next_id}", random_name(rng), float(rng.randint(1, 500)), rng.randint(1, 50),
+                                              f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}", "Stress",
+                                              rng.choice(["Food", "Toys", "Tools"])))
+            elif action < 0.6:
+                inventory.delete_product(rng.choice(inventory.products).product_id)
+            elif action < 0.8:
+                changes = rng.choice([{"name": random_name(rng)}, {"unit_price": float(rng.randint(1, 500))},
+                                      {"quantity": rng.randint(0, 50)}])
+                inventory.update_product(rng.choice(inventory.products).product_id, **changes)
+            elif action < 0.98:
+                product = rng.choice(inventory.products)
+                inventory.update_product_quantity(product, rng.randint(0, product.quantity))
+            else:
+                inventory.low_stock_threshold = rng.randint(0, 50)
+            check(inventory, rng)
+
+        inventory.save_products(checkpoint=True)
+        inventory.flush()
+        assert not os.path.exists(inventory.wal.rotated_path), "checkpoint left its rotated journal behind"
+        for product in rng.sample(inventory.products, min(50, len(inventory.products))):  # Only journaled from here
+            inventory.update_product(product.product_id, unit_price=float(rng.randint(1, 500)))
+            inventory.update_product_quantity(product, rng.randint(0, product.quantity))
+        inventory.persistence.stop()
+        inventory.wal.close()  # No save: the reload below is a restart after a crash
+        state = {p.product_id: (p.name, p.quantity, p.unit_price) for p in inventory.products}
+        reloaded = InventoryManager(json_file, journaled=True)  # JSON + journal replay must give the same catalog
+        assert {p.product_id: (p.name, p.quantity, p.unit_price) for p in reloaded.products} == state, "journal replay lost changes"
+        reloaded.wal.close()
+
+        print(f"✓ {inventory.persistence}")
+        print(f"✓ {operations} operations, {len(inventory.products)} products left, all indexes consistent")
+    finally:
+        shutil.rmtree(workdir)
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
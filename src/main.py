@@ -2,7 +2,7 @@ from utilities.inventory_manager import InventoryManager
 from ui.console_ui import ConsoleUI
 
 def main():
-    inventory = InventoryManager("data/stock.json")
+    inventory = InventoryManager("data/stock.json", journaled=True)
     
     ui = ConsoleUI(inventory)
     
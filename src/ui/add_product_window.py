@@ -175,10 +175,13 @@ class AddProductWindow:
                 return
             
             # Check if product ID already exists
-            for p in self.inventory.products:
-                if p.product_id == product_id:
-                    messagebox.showerror("Error", f"Product ID '{product_id}' already exists")
-                    return
+            if self.inventory.get(product_id) is not None:
+                messagebox.showerror("Error", f"Product ID '{product_id}' already exists")
+                return
+            
+            if self.inventory.has_product_named(name) and not messagebox.askyesno(
+                    "Duplicate Name", f"A product named '{name}' already exists. Add it anyway?"):
+                return
             
             # Validate quantity and price
             if quantity < 0:
@@ -18,6 +18,8 @@ class ConsoleUI:
         print("3. View Inventory")
         print("4. Update Product")
         print("5. Save & Exit")
+        print("6. Expiry Report")
+        print("7. Stock Report")
         print("="*50)
     
     def login_worker(self):
@@ -37,10 +39,13 @@ class ConsoleUI:
                 break
             if not search_term:
                 continue
-            matches = self.inventory.search_with_autocomplete(search_term)  # Get autocompleted suggestions
+            matches = self.inventory.search_with_autocomplete(search_term, limit=20, rank_by="popularity", max_distance=2, phonetic=True)  # Get autocompleted suggestions
             if not matches:
-                print("✗ No products found matching '{}'".format(search_term))
-                continue
+                matches = self.inventory.suggest(search_term)[:20]  # Fall back to whole-name corrections
+                if not matches:
+                    print("✗ No products found matching '{}'".format(search_term))
+                    continue
+                print("✗ No products found matching '{}'. Did you mean:".format(search_term))
             
             print(f"\n{'#':<4} {'Name':<20} {'Stock':<8} {'Price':<10}")  # Header for displaying matching products
             print("-"*45)
@@ -124,14 +129,24 @@ class ConsoleUI:
         sort_by = {"1": "expiry", "2": "name", "3": "stock"}.get(choice, "expiry")
         self.inventory.display_inventory(sort_by)
 
+    def expiry_report(self):
+        days = input("\nDays ahead (default 7): ").strip()
+        try:
+            self.inventory.display_expiry_report(int(days) if days else 7)
+        except ValueError:
+            print("✗ Invalid number of days")
+    
+    def stock_report(self):
+        by = input("\nGroup by category or supplier (default category): ").strip().lower() or "category"
+        if by not in ("category", "supplier"):
+            print("✗ Invalid grouping")
+            return
+        self.inventory.display_stock_report(by)
+    
     def update_product(self):
         product_id = input("\nProduct ID to update: ").strip()
         
-        product = None
-        for p in self.inventory.products:
-            if p.product_id == product_id:
-                product = p
-                break
+        product = self.inventory.get(product_id)
         if not product:
             print("✗ Product not found")
             return
@@ -144,12 +159,12 @@ class ConsoleUI:
         choice = input("Choice: ").strip()
         
         try:
+            changes = {}
             if choice in ["1", "3"]:
-                new_quantity = int(input("New quantity: "))
-                product.quantity = new_quantity
+                changes["quantity"] = int(input("New quantity: "))
             if choice in ["2", "3"]:
-                new_price = float(input("New price (in cents): "))
-                product.unit_price = new_price
+                changes["unit_price"] = float(input("New price (in cents): "))
+            self.inventory.update_product(product.product_id, **changes)
             self.inventory.save_products()
             print(f"✓ Updated {product.name}")
         except ValueError as e:
@@ -163,7 +178,7 @@ class ConsoleUI:
         
         while True:
             self.display_menu()
-            choice = input("\nSelect option (1-5): ").strip()
+            choice = input("\nSelect option (1-7): ").strip()
             
             if choice == "1":
                 self.login_worker()
@@ -174,8 +189,13 @@ class ConsoleUI:
             elif choice == "4":
                 self.update_product()
             elif choice == "5":
-                self.inventory.save_products()
+                self.inventory.save_products(checkpoint=True)  # Folds the journal into the JSON before leaving
+                self.inventory.close()
                 print("\n✓ Goodbye!")
                 break
+            elif choice == "6":
+                self.expiry_report()
+            elif choice == "7":
+                self.stock_report()
             else:
                 print("✗ Invalid option")
\ No newline at end of file
@@ -8,7 +8,7 @@ class InventoryGUIApp:
     def __init__(self):
         self.root = tk.Tk()
         self.root.withdraw()  # Hide main window initially
-        self.inventory = InventoryManager("data/stock.json")
+        self.inventory = InventoryManager("data/stock.json", journaled=True, background=True)
         self.current_worker = None
         self.setup_styles()
         self.show_login()
@@ -36,4 +36,5 @@ class InventoryGUIApp:
         )
     
     def run(self):
-        self.root.mainloop()
\ No newline at end of file
+        self.root.mainloop()
+        self.inventory.close()  # Waits for the last background save before the process exits
\ No newline at end of file
@@ -129,22 +129,13 @@ class InventoryWindow:
         
         # Get sort option
         sort_by = self.sort_var.get()
-        if sort_by == "name":
-            products = sorted(self.inventory.products, key=lambda p: p.name)
-        elif sort_by == "stock":
-            products = sorted(self.inventory.products, key=lambda p: p.quantity)
-        elif sort_by == "expiry":
-            products = self.inventory.get_products_sorted_by_expiry()
-        elif sort_by == "price":
-            products = sorted(self.inventory.products, key=lambda p: p.unit_price)
-        else:
-            products = self.inventory.products
+        products = self.inventory.sorted_products(sort_by)  # Maintained indexes, no sort per refresh
         
         for product in products:
             tags = ()
             if product.quantity == 0:
                 tags = ('out_of_stock',)
-            elif product.quantity < 30:
+            elif product.quantity < self.inventory.low_stock_threshold:
                 tags = ('low_stock',)
             
             self.tree.insert('', tk.END, values=(
@@ -162,33 +153,29 @@ class InventoryWindow:
         self.tree.tag_configure('out_of_stock', background='#F8D7DA')
     
     def filter_products(self, *args):
-        search_term = self.search_var.get().lower()
+        search_term = self.search_var.get()
         
         # Clear tree
         for item in self.tree.get_children():
             self.tree.delete(item)
         
-        # Filter and display
-        for product in self.inventory.products:
-            if (search_term in product.name.lower() or
-                search_term in product.category.lower() or
-                search_term in product.product_id.lower()):
-                
-                tags = ()
-                if product.quantity == 0:
-                    tags = ('out_of_stock',)
-                elif product.quantity < 30:
-                    tags = ('low_stock',)
-                
-                self.tree.insert('', tk.END, values=(
-                    product.product_id,
-                    product.name,
-                    product.category,
-                    product.quantity,
-                    f"FCFA {product.unit_price:.2f}",
-                    product.expiry_date,
-                    product.supplier
-                ), tags=tags)
+        # Filter through the n-gram index and display
+        for product in self.inventory.search_substring(search_term):
+            tags = ()
+            if product.quantity == 0:
+                tags = ('out_of_stock',)
+            elif product.quantity < self.inventory.low_stock_threshold:
+                tags = ('low_stock',)
+            
+            self.tree.insert('', tk.END, values=(
+                product.product_id,
+                product.name,
+                product.category,
+                product.quantity,
+                f"FCFA {product.unit_price:.2f}",
+                product.expiry_date,
+                product.supplier
+            ), tags=tags)
     
     def edit_product(self, event=None):
         selection = self.tree.selection()
@@ -200,11 +187,7 @@ class InventoryWindow:
         product_id = item['values'][0]
         
         # Find product object
-        product = None
-        for p in self.inventory.products:
-            if p.product_id == product_id:
-                product = p
-                break
+        product = self.inventory.get(str(product_id))  # Treeview turns numeric-looking IDs into ints
         
         if not product:
             return
@@ -302,8 +285,7 @@ class EditProductDialog:
                 return
             
             # Update product
-            self.product.quantity = new_qty
-            self.product.unit_price = new_price
+            self.inventory.update_product(self.product.product_id, quantity=new_qty, unit_price=new_price)
             
             # Save inventory
             self.inventory.save_products()
@@ -325,7 +307,7 @@ class EditProductDialog:
           return
         product_id = self.tree.item(selection[0])['values'][0]
         if messagebox.askyesno("Confirm", "Delete this product?"):
-           if self.inventory.delete_product(product_id):
+           if self.inventory.delete_product(str(product_id)):
              self.load_products()
              messagebox.showinfo("Success", "Product deleted")
              ttk.Button(
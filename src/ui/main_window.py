@@ -4,9 +4,9 @@ from ui.sale_window import SaleWindow
 from ui.inventory_window import InventoryWindow
 from ui.login_window import LoginWindow
 from ui.add_product_window import AddProductWindow
-from datetime import datetime
 import json
 import os
+import threading
 import tkinter.filedialog as fd
 from ui.receipt_viewer import ReceiptViewer
 
@@ -130,20 +130,10 @@ class MainWindow:
             self.stats_labels[key].pack(anchor=tk.W)
                 
     def update_statistics(self):
-        total = len(self.inventory.products)
-        low_stock = sum(1 for p in self.inventory.products if p.quantity < 30)
-        out_of_stock = sum(1 for p in self.inventory.products if p.quantity == 0)
+        stats = self.inventory.stats  # Kept current by the inventory, no pass over the products
+        total, low_stock, out_of_stock = stats.total, stats.low_stock, stats.out_of_stock
 
-        expiring_soon = 0
-        today = datetime.now()
-        for p in self.inventory.products:
-            try:
-                expiry = datetime.strptime(p.expiry_date, "%Y-%m-%d")
-                days_until_expiry = (expiry - today).days
-                if 0 <= days_until_expiry <= 7:
-                    expiring_soon += 1
-            except:
-                pass
+        expiring_soon = len(self.inventory.expiring_within(7))  # Two bisects on the expiry index
         
         self.stats_labels['total_products'].config(text=str(total))
         self.stats_labels['low_stock'].config(
@@ -169,7 +159,18 @@ class MainWindow:
         AddProductWindow(self.root, self.inventory, self.update_statistics)
     
     def save_inventory(self):
-        if self.inventory.save_products():
+        # Folds the journal into the JSON on the worker thread, an explicit Save reports the real result once it is on disk
+        if not self.inventory.save_products(checkpoint=True):
+            messagebox.showerror("Error", "Failed to save inventory")
+            return
+        result = []  # Filled by the thread below, a full checkpoint of a big catalog takes seconds
+        threading.Thread(target=lambda: result.append(self.inventory.flush()), name="save-wait", daemon=True).start()
+        self.report_save(result)
+    
+    def report_save(self, result):  # Polled from the Tk loop until the save is done, the window stays responsive meanwhile
+        if not result:
+            self.root.after(100, self.report_save, result)
+        elif result[0]:
             messagebox.showinfo("Success", "Inventory saved successfully!")
         else:
             messagebox.showerror("Error", "Failed to save inventory")
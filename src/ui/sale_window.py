@@ -3,6 +3,9 @@ from tkinter import ttk, messagebox
 from models.receipt import Receipt
 from ui.receipt_viewer import ReceiptViewer
 import os, json
+from itertools import islice
+
+PAGE_SIZE = 50  # Search results pulled from the trie per page
 
 class SaleWindow:
     def __init__(self, parent, inventory, worker, update_callback):
@@ -55,6 +58,10 @@ class SaleWindow:
             width=30
         )
         self.search_entry.pack(side=tk.LEFT, padx=5)
+        
+        # "Did you mean" hint shown when nothing starts with the search term
+        self.suggestion_label = ttk.Label(search_controls, text="", foreground='gray')
+        self.suggestion_label.pack(side=tk.LEFT, padx=5)
 
         results_frame = ttk.Frame(search_frame)
         results_frame.pack(fill=tk.BOTH, expand=True)
@@ -72,11 +79,22 @@ class SaleWindow:
 
         self.results_listbox.bind('<Double-Button-1>', self.add_to_cart)
         
+        results_buttons = ttk.Frame(search_frame)
+        results_buttons.pack(pady=5)
+        
         ttk.Button(
-            search_frame,
+            results_buttons,
             text="Add to Cart",
             command=self.add_to_cart
-        ).pack(pady=5)
+        ).pack(side=tk.LEFT, padx=5)
+        
+        self.more_button = ttk.Button(
+            results_buttons,
+            text=f"Next {PAGE_SIZE}",
+            command=self.show_more_results,
+            state=tk.DISABLED
+        )
+        self.more_button.pack(side=tk.LEFT, padx=5)
         
         cart_frame = ttk.LabelFrame(main_frame, text="Cart", padding="10")
         cart_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
@@ -143,21 +161,36 @@ class SaleWindow:
     
     def on_search_change(self, *args):
         search_term = self.search_var.get()
-        if not search_term:
-            self.results_listbox.delete(0, tk.END)
-            return
-        
-        # Search products
-        matches = self.inventory.search_with_autocomplete(search_term)
-        
-        # Update listbox
         self.results_listbox.delete(0, tk.END)
-        for product in matches:
+        self.current_matches = []
+        
+        # Search products lazily, only the first page is pulled from the trie
+        self.match_stream = self.inventory.iter_autocomplete(search_term)
+        self.show_more_results()
+        
+        self.suggestion_label.config(text="")
+        if not self.current_matches and search_term.strip():
+            # No name starts with the term, suggest corrections and list typo-tolerant matches closest first
+            suggestions = self.inventory.suggest(search_term)
+            if suggestions:
+                names = ", ".join(product.name for product in suggestions[:3])
+                self.suggestion_label.config(text=f"Did you mean: {names}?")
+            fallback = (self.inventory.search_fuzzy(search_term, max_distance=2)
+                        or self.inventory.search_phonetic(search_term)
+                        or suggestions)
+            self.match_stream = iter(fallback)
+            self.show_more_results()
+    
+    def show_more_results(self):
+        """Append the next page of matches to the listbox"""
+        page = list(islice(self.match_stream, PAGE_SIZE))
+        for product in page:
             display_text = f"{product.name} - Stock: {product.quantity} - FCFA {product.unit_price:.2f}"
             self.results_listbox.insert(tk.END, display_text)
         
         # Store matches for reference
-        self.current_matches = matches
+        self.current_matches.extend(page)
+        self.more_button.config(state=tk.NORMAL if len(page) == PAGE_SIZE else tk.DISABLED)
     
     def add_to_cart(self, event=None):
         """Add selected product to cart"""
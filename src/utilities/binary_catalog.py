@@ -0,0 +1,104 @@
+import json
+import struct
+from datetime import date
+
+# Binary layout:
+#   header    MAGIC, version, product count, string count, string table bytes, metadata bytes (little-endian)
+#   metadata  the JSON file's "metadata" object, UTF-8 JSON
+#   strings   every distinct product_id, name, category, supplier (and unparsable expiry date), UTF-8,
+#             separated by NUL bytes, so a category shared by 10k products is stored once
+#   rows      product count fixed-width records in catalog order: string indexes of product_id, name, category
+#             and supplier, quantity, unit price, expiry ordinal (date.toordinal), and the string index of the
+#             expiry date when it is not a YYYY-MM-DD date (ordinal 0), NO_STRING otherwise, then a flags byte
+MAGIC = b"INVC"
+VERSION = 2  # 2: flags byte per row, version 1 files are still read (their prices come back as floats)
+HEADER = struct.Struct("<4sHIIII2x")
+ROW = struct.Struct("<IIIIqdIIB")
+ROW_V1 = struct.Struct("<IIIIqdII")
+NO_STRING = 0xFFFFFFFF
+INT_PRICE = 1  # Row flag: unit_price was an int, the double holds it exactly and it is read back as one
+
+def pack_catalog(rows, metadata: dict):  # Product.to_dict() rows -> bytes
+    strings = {}
+    def intern(value: str):
+        index = strings.get(value)
+        if index is None:
+            if "\0" in value:
+                raise ValueError(f"NUL character in {value!r}")
+            index = strings[value] = len(strings)
+        return index
+
+    packed = bytearray()
+    for row in rows:
+        expiry = row["expiry_date"]
+        try:
+            ordinal = date.fromisoformat(expiry).toordinal()
+            expiry_text = NO_STRING if date.fromordinal(ordinal).isoformat() == expiry else intern(expiry)
+        except (TypeError, ValueError):
+            ordinal, expiry_text = 0, intern(str(expiry))
+        unit_price = row["unit_price"]
+        packed += ROW.pack(intern(row["product_id"]), intern(row["name"]), intern(row.get("category", "")),
+                           intern(row["supplier"]), row["quantity_in_stock"], unit_price, ordinal, expiry_text,
+                           INT_PRICE if isinstance(unit_price, int) else 0)
+
+    string_table = "\0".join(strings).encode("utf-8")
+    metadata_bytes = json.dumps(metadata, separators=(",", ":")).encode("utf-8")
+    header = HEADER.pack(MAGIC, VERSION, len(packed) // ROW.size, len(strings), len(string_table), len(metadata_bytes))
+    return b"".join((header, metadata_bytes, string_table, packed))
+
+def _check_header(data):
+    if len(data) < HEADER.size:
+        raise ValueError("Not a binary catalog (file too short)")
+    magic, version, *sizes = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("Not a binary catalog (bad magic)")
+    if version not in (1, VERSION):
+        raise ValueError(f"Binary catalog version {version} is not supported (expected {VERSION})")
+    return version, *sizes
+
+def unpack_metadata(data):
+    _, _, _, _, metadata_length = _check_header(data)
+    return json.loads(bytes(data[HEADER.size:HEADER.size + metadata_length]))
+
+def unpack_catalog(data, progress=None):  # Yields Product.to_dict() rows, progress(fraction) every 10k rows
+    version, count, string_count, strings_length, metadata_length = _check_header(data)
+    row = ROW if version == VERSION else ROW_V1
+    offset = HEADER.size + metadata_length
+    strings = bytes(data[offset:offset + strings_length]).decode("utf-8").split("\0") if string_count else []
+    offset += strings_length
+    if len(data) != offset + count * row.size or len(strings) != string_count:
+        raise ValueError("Binary catalog is truncated or corrupt")
+
+    dates = {}  # ordinal -> "YYYY-MM-DD", a catalog has far fewer distinct dates than products
+    for loaded, (product_id, name, category, supplier, quantity, unit_price, ordinal, expiry_text, *flags) in enumerate(
+            row.iter_unpack(memoryview(data)[offset:]), 1):
+        if flags and flags[0] & INT_PRICE:
+            unit_price = int(unit_price)
+        if expiry_text != NO_STRING:
+            expiry = strings[expiry_text]
+        else:
+            expiry = dates.get(ordinal)
+            if expiry is None:
+                expiry = dates[ordinal] = date.fromordinal(ordinal).isoformat()
+        yield {
+            "product_id": strings[product_id],
+            "name": strings[name],
+            "category": strings[category],
+            "quantity_in_stock": quantity,
+            "unit_price": unit_price,
+            "expiry_date": expiry,
+            "supplier": strings[supplier]
+        }
+        if progress is not None and loaded % 10_000 == 0:
+            progress(loaded / count)
+
+def read_catalog(path: str, progress=None):  # One read of the whole file, rows are decoded as they are consumed
+    with open(path, "rb") as f:
+        data = f.read()
+    return unpack_catalog(data, progress)
+
+def read_metadata(path: str):  # Only the header and metadata are read
+    with open(path, "rb") as f:
+        data = f.read(HEADER.size)
+        _, _, _, _, metadata_length = _check_header(data)
+        return unpack_metadata(data + f.read(metadata_length))
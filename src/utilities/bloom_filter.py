@@ -1,4 +1,6 @@
 import hashlib
+import math
+from collections import Counter
 
 class BloomFilter:
     def __init__(self, size: int = 1000, hash_count: int = 3):
@@ -6,26 +8,220 @@ class BloomFilter:
         # The more the hash_count, the higher the accuracy
         self.size = size
         self.hash_count = hash_count
-        self.bit_array = [0] * size
-        
-    def _hash(self, item: str, seed: int):
-        hash_obj = hashlib.md5(f"{item}{seed}".encode())
-        return int(hash_obj.hexdigest(), 16) % self.size
-    
+        self.bits = bytearray((size + 7) // 8)  # Bit i is bits[i >> 3] & (1 << (i & 7))
+        self.count = 0  # Items added so far
+        self.capacity = None  # Items the filter was sized for, None when size was picked by hand
+
+    @classmethod
+    def for_capacity(cls, expected_items: int, fp_rate: float = 0.01):
+        # Optimal size m = -n ln(p) / ln(2)^2 and hash count k = m/n ln(2) for n items at false-positive rate p
+        expected_items = max(expected_items, 1)
+        size = math.ceil(-expected_items * math.log(fp_rate) / math.log(2) ** 2)
+        bloom = cls(size, max(1, round(size / expected_items * math.log(2))))
+        bloom.capacity = expected_items
+        return bloom
+
+    def _positions(self, item: str):  # Every probe position of an already lowercased item
+        # One 128-bit digest split in two halves h1, h2, probe i is h1 + i * h2 (Kirsch-Mitzenmacher double hashing)
+        digest = int.from_bytes(hashlib.blake2b(item.encode(), digest_size=16).digest(), "little")
+        h1, h2 = digest & 0xFFFFFFFFFFFFFFFF, (digest >> 64) | 1  # Odd h2 so the probes don't collapse when size is even
+        size = self.size
+        return [(h1 + i * h2) % size for i in range(self.hash_count)]
+
     def add(self, item: str):  # Method to add an item to a bloom filter
-        item = item.lower()
-        for i in range(self.hash_count):
-            index = self._hash(item, i)
-            self.bit_array[index] = 1
-    
+        self.count += 1
+        bits = self.bits
+        for index in self._positions(item.lower()):
+            bits[index >> 3] |= 1 << (index & 7)
+
     def contain(self, item: str):  # Method to search for an item in a bloom filter
-        item = item.lower()
-        for i in range(self.hash_count):
-            index = self._hash(item, i)
-            if self.bit_array[index] == 0:
+        bits = self.bits
+        for index in self._positions(item.lower()):
+            if not bits[index >> 3] & (1 << (index & 7)):
                 return False
         return True
-    
+
+    def add_many(self, items):  # Same as add in a loop, with the digest and probe loop inlined
+        bits, size, probes = self.bits, self.size, range(self.hash_count)
+        blake2b, from_bytes = hashlib.blake2b, int.from_bytes
+        for item in items:
+            self.count += 1
+            digest = from_bytes(blake2b(item.lower().encode(), digest_size=16).digest(), "little")
+            h1, h2 = digest & 0xFFFFFFFFFFFFFFFF, (digest >> 64) | 1
+            for i in probes:
+                index = (h1 + i * h2) % size
+                bits[index >> 3] |= 1 << (index & 7)
+
+    def contains_many(self, items):  # One bool per item, in order
+        bits, size, probes = self.bits, self.size, range(self.hash_count)
+        blake2b, from_bytes = hashlib.blake2b, int.from_bytes
+        found = []
+        for item in items:
+            digest = from_bytes(blake2b(item.lower().encode(), digest_size=16).digest(), "little")
+            h1, h2 = digest & 0xFFFFFFFFFFFFFFFF, (digest >> 64) | 1
+            for i in probes:
+                index = (h1 + i * h2) % size
+                if not bits[index >> 3] & (1 << (index & 7)):
+                    found.append(False)
+                    break
+            else:
+                found.append(True)
+        return found
+
+    def is_full(self):  # Past the item count it was sized for, the false-positive rate climbs above target
+        return self.capacity is not None and self.count > self.capacity
+
+    def false_positive_rate(self):  # Estimated from the fill: a miss passes when all its probes hit set bits
+        return (self.ones() / self.size) ** self.hash_count
+
+    def ones(self):
+        return int.from_bytes(self.bits, "little").bit_count()
+
     def __str__(self):  # Displaying the size and number of 1 bits in the bloom filter
-        ones = sum(self.bit_array)
-        return f"BloomFilter(size={self.size}, filled={ones}/{self.size})"
\ No newline at end of file
+        return (f"{type(self).__name__}(size={self.size}, hashes={self.hash_count}, filled={self.ones()}/{self.size}, "
+                f"~{self.false_positive_rate():.2%} false positives)")
+
+
+class CountingBloomFilter(BloomFilter):
+    # Keeps a 4-bit counter per slot next to the bit, so names can be removed again and the filter
+    # stays usable as a negative check through a day of deletes and renames. Two counters share a byte.
+    # A counter that reaches 15 sticks there: its true count is unknown, so it must never drop to 0.
+    MAX_COUNT = 15
+
+    def __init__(self, size: int = 1000, hash_count: int = 3):
+        super().__init__(size, hash_count)
+        self.counters = bytearray((size + 1) // 2)  # Slot i is the low nibble of byte i >> 1 when i is even, the high one when odd
+
+    def counter(self, index: int):
+        return (self.counters[index >> 1] >> ((index & 1) << 2)) & 0xF
+
+    def add(self, item: str):
+        self.count += 1
+        bits, counters = self.bits, self.counters
+        for index in self._positions(item.lower()):
+            shift = (index & 1) << 2
+            if (counters[index >> 1] >> shift) & 0xF < self.MAX_COUNT:
+                counters[index >> 1] += 1 << shift
+            bits[index >> 3] |= 1 << (index & 7)
+
+    def add_many(self, items):  # Same as add in a loop, each distinct item is hashed once
+        self.add_counts(Counter(item.lower() for item in items))
+
+    def add_counts(self, counts):  # Lowercase item -> how many times it is added, with the digest and probe loop inlined
+        bits, counters, size, probes, max_count = self.bits, self.counters, self.size, range(self.hash_count), self.MAX_COUNT
+        blake2b, from_bytes = hashlib.blake2b, int.from_bytes
+        for item, times in counts.items():
+            self.count += times
+            digest = from_bytes(blake2b(item.encode(), digest_size=16).digest(), "little")
+            h1, h2 = digest & 0xFFFFFFFFFFFFFFFF, (digest >> 64) | 1
+            for i in probes:
+                index = (h1 + i * h2) % size
+                shift = (index & 1) << 2
+                byte = counters[index >> 1]
+                value = min(((byte >> shift) & 0xF) + times, max_count)  # Same as times adds, which stop at MAX_COUNT
+                counters[index >> 1] = (byte & ~(0xF << shift)) | (value << shift)
+                bits[index >> 3] |= 1 << (index & 7)
+
+    def remove(self, item: str):  # Only call for items that were added, otherwise other items get false negatives
+        self.count -= 1
+        bits, counters = self.bits, self.counters
+        for index in self._positions(item.lower()):
+            shift = (index & 1) << 2
+            value = (counters[index >> 1] >> shift) & 0xF
+            if 0 < value < self.MAX_COUNT:
+                counters[index >> 1] -= 1 << shift
+                if value == 1:
+                    bits[index >> 3] &= ~(1 << (index & 7))
+
+    def saturated(self):  # Slots stuck at MAX_COUNT, a rebuild clears them
+        return sum(self.counter(i) == self.MAX_COUNT for i in range(self.size))
+
+
+class PrefixBloomFilter(CountingBloomFilter):
+    # Holds every lowercase prefix of every name, so "does any name start with this?" is one filter check.
+    # Prefixes are cut at max_length: longer queries are checked by their first max_length characters,
+    # which keeps long names from flooding the filter. Counting, so a deleted name takes its prefixes along.
+    def __init__(self, size: int = 1000, hash_count: int = 3, max_length: int = 12):
+        super().__init__(size, hash_count)
+        self.max_length = max_length
+
+    @classmethod
+    def for_names(cls, names, headroom: int = 2, fp_rate: float = 0.01, max_length: int = 12):
+        # Sized for headroom times the prefixes of names, the names themselves are added too
+        names = [name.lower() for name in names]
+        prefix_count = sum(min(len(name), max_length) for name in names)
+        bloom = cls.for_capacity(prefix_count * headroom, fp_rate)
+        bloom.max_length = max_length
+        bloom.add_many(names)
+        return bloom
+
+    def add_many(self, names):  # A prefix shared by n names is hashed once and counted n times
+        max_length = self.max_length
+        counts = Counter()
+        for name in names:
+            name = name.lower()
+            counts.update(name[:end] for end in range(1, min(len(name), max_length) + 1))
+        self.add_counts(counts)
+
+    def _prefixes(self, name: str):
+        name = name.lower()
+        return [name[:end] for end in range(1, min(len(name), self.max_length) + 1)]
+
+    def add(self, name: str):
+        for prefix in self._prefixes(name):
+            super().add(prefix)
+
+    def remove(self, name: str):
+        for prefix in self._prefixes(name):
+            super().remove(prefix)
+
+    def contain(self, prefix: str):  # False means no name starts with prefix
+        return super().contain(prefix[:self.max_length])
+
+    def contains_many(self, prefixes):
+        return [self.contain(prefix) for prefix in prefixes]
+
+
+class ScalableBloomFilter:
+    # Chain of BloomFilter slices for a catalog that outgrows its estimate. When the newest slice is full
+    # a bigger one is added with a tighter false-positive rate, so the overall rate stays under fp_rate
+    # (the slice rates fp_rate * (1 - tightening) * tightening^i sum to fp_rate).
+    def __init__(self, initial_capacity: int = 1000, fp_rate: float = 0.01, growth: int = 2, tightening: float = 0.5):
+        self.fp_rate = fp_rate
+        self.growth = growth
+        self.tightening = tightening
+        self.slices = []
+        self._add_slice(initial_capacity)
+
+    def _add_slice(self, capacity: int):
+        slice_fp_rate = self.fp_rate * (1 - self.tightening) * self.tightening ** len(self.slices)
+        self.slices.append(BloomFilter.for_capacity(capacity, slice_fp_rate))
+
+    def add(self, item: str):
+        newest = self.slices[-1]
+        if newest.count >= newest.capacity:
+            self._add_slice(newest.capacity * self.growth)
+            newest = self.slices[-1]
+        newest.add(item)
+
+    def contain(self, item: str):
+        return any(bloom.contain(item) for bloom in self.slices)
+
+    def add_many(self, items):
+        for item in items:
+            self.add(item)
+
+    def contains_many(self, items):
+        return [self.contain(item) for item in items]
+
+    @property
+    def count(self):
+        return sum(bloom.count for bloom in self.slices)
+
+    def false_positive_rate(self):  # A miss passes if any slice lets it through
+        return 1 - math.prod(1 - bloom.false_positive_rate() for bloom in self.slices)
+
+    def __str__(self):
+        size = sum(bloom.size for bloom in self.slices)
+        return (f"ScalableBloomFilter({len(self.slices)} slices, size={size}, items={self.count}, "
+                f"~{self.false_positive_rate():.2%} false positives)")
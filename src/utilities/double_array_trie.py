@@ -0,0 +1,106 @@
+from array import array
+from itertools import islice
+
+class DoubleArrayTrie:
+    # Read-only trie compiled from a live Trie. Transitions live in two flat int arrays:
+    # the child of state s on character c is t = base[s] + code(c), valid when check[t] == s.
+    # That is one addition and one comparison per character instead of a dict lookup per node object.
+    # The sorted child codes of every state are kept too, so a subtree walks in lexicographic order.
+    def __init__(self):
+        self.codes = {}  # character -> code, codes follow character order
+        self.base = array("i", [0])
+        self.check = array("i", [0])  # State 0 is the root
+        self.first_label = array("i", [0])  # Offset of a state's sorted child codes in labels
+        self.label_count = array("i", [0])
+        self.labels = array("i")
+        self.outputs = {}  # state -> products whose name ends there
+        self.product_count = 0
+
+    @classmethod
+    def compile(cls, trie):  # Flattens trie, which can keep changing afterwards
+        frozen = cls()
+        alphabet = set()
+        stack = [trie.root]
+        while stack:
+            node = stack.pop()
+            alphabet.update(node.children)
+            stack.extend(node.children.values())
+        frozen.codes = {char: i + 1 for i, char in enumerate(sorted(alphabet))}
+
+        used = bytearray(1)  # 1 where check[] holds a state, lets bytes.find skip taken runs at C speed
+        used[0] = 1
+        queue = [(trie.root, 0)]
+        for node, state in queue:  # Growing the list while iterating gives the BFS order
+            if node.products:
+                frozen.outputs[state] = tuple(node.products)
+                frozen.product_count += len(node.products)
+            if not node.children:
+                continue
+
+            children = sorted((frozen.codes[char], child) for char, child in node.children.items())
+            child_codes = [code for code, _ in children]
+            base = frozen._find_base(child_codes, used)
+            frozen.base[state] = base
+            frozen.first_label[state] = len(frozen.labels)
+            frozen.label_count[state] = len(child_codes)
+            frozen.labels.extend(child_codes)
+            for code, child in children:
+                frozen.check[base + code] = state
+                used[base + code] = 1
+                queue.append((child, base + code))
+        return frozen
+
+    def _find_base(self, child_codes, used: bytearray):  # First base where every child slot is free
+        first = child_codes[0]
+        position = used.find(0, first + 1)  # Candidate slot for the first child, base must stay >= 1
+        while True:
+            if position < 0:  # Every slot is taken, start past the end
+                position = max(len(used), first + 1)
+            base = position - first
+            needed = base + child_codes[-1] + 1
+            if needed > len(used):  # Grow every per-state array together
+                grow = needed - len(used)
+                used.extend(bytes(grow))
+                self.check.extend([-1] * grow)
+                self.base.extend([0] * grow)
+                self.first_label.extend([0] * grow)
+                self.label_count.extend([0] * grow)
+            if not any(used[base + code] for code in child_codes):
+                return base
+            position = used.find(0, position + 1)
+
+    def _find_state(self, prefix: str):  # State reached by prefix, -1 when no name starts with it
+        state = 0
+        base, check, codes = self.base, self.check, self.codes
+        size = len(check)
+        for char in prefix.lower():
+            code = codes.get(char)
+            if code is None:
+                return -1
+            target = base[state] + code
+            if target >= size or check[target] != state:
+                return -1
+            state = target
+        return state
+
+    def iter_prefix(self, prefix: str):  # Products starting with prefix in lexicographic order
+        state = self._find_state(prefix)
+        if state < 0:
+            return
+        base, first_label, label_count, labels, outputs = self.base, self.first_label, self.label_count, self.labels, self.outputs
+        stack = [state]
+        while stack:
+            current = stack.pop()
+            if current in outputs:
+                yield from outputs[current]
+            count = label_count[current]
+            if count:
+                offset = base[current]
+                start = first_label[current]
+                stack.extend([offset + code for code in labels[start + count - 1:start - 1 if start else None:-1]])
+
+    def search_prefix(self, prefix: str, limit: int = None):  # Name-ordered, like Trie.search_prefix with rank_by="name"
+        return list(islice(self.iter_prefix(prefix), limit))
+
+    def __str__(self):
+        return f"DoubleArrayTrie({len(self.check)} slots, {len(self.labels) + 1} states, {self.product_count} products)"
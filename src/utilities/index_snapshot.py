@@ -0,0 +1,149 @@
+import hashlib
+import mmap
+import os
+import struct
+from array import array
+from utilities.bloom_filter import BloomFilter
+
+# Binary layout:
+#   header   MAGIC, version, source size, source mtime_ns, sha256 of the source JSON,
+#            node count, product slot count, bloom size, bloom hash count (little-endian, padded to 72 bytes)
+#   nodes    five native uint32 arrays of node_count entries (BFS order, children of a node are contiguous
+#            and sorted by character): first_child, child_count, first_slot, slot_count, char
+#   slots    uint32 array of product ordinals (position of the product in the source JSON)
+#   bloom    bloom bits packed 8 per byte
+MAGIC = b"IDXS"
+VERSION = 2  # 2: bloom probes from one digest (double hashing)
+HEADER = struct.Struct("<4sHQQ32sIIII2x")
+NODE_FIELDS = 5
+
+def file_checksum(path: str):  # sha256 of a file, read in chunks so big catalogs are not loaded at once
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+def write_snapshot(path: str, source_path: str, trie, bloom_filter, products):
+    # Flattens the live Trie and BloomFilter into path, stamped with the identity of source_path
+    ordinals = {id(product): i for i, product in enumerate(products)}
+    columns = [array("I") for _ in range(NODE_FIELDS)]
+    first_child, child_count, first_slot, slot_count, chars = columns
+    slots = array("I")
+
+    queue = [(trie.root, 0)]  # The root has no character, 0 is never looked up
+    for node, char in queue:  # Growing the list while iterating gives the BFS order
+        first_child.append(len(queue))
+        child_count.append(len(node.children))
+        first_slot.append(len(slots))
+        slot_count.append(len(node.products))
+        chars.append(char)
+        slots.extend(ordinals[id(product)] for product in node.products)
+        queue.extend((node.children[c], ord(c)) for c in sorted(node.children))
+
+    stat = os.stat(source_path)
+    header = HEADER.pack(MAGIC, VERSION, stat.st_size, stat.st_mtime_ns, file_checksum(source_path),
+                         len(queue), len(slots), bloom_filter.size, bloom_filter.hash_count)
+
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(header)
+        for column in columns:
+            f.write(column.tobytes())
+        f.write(slots.tobytes())
+        f.write(bloom_filter.bits)  # Already packed 8 per byte
+    os.replace(temp_path, path)  # Readers never see a half written snapshot
+
+def restamp_snapshot(path: str, source_path: str):  # Source changed but the names did not (a sale), refresh the stamp only
+    with open(path, "r+b") as f:
+        magic, version, _, _, _, *counts = HEADER.unpack(f.read(HEADER.size))
+        stat = os.stat(source_path)
+        f.seek(0)
+        f.write(HEADER.pack(magic, version, stat.st_size, stat.st_mtime_ns, file_checksum(source_path), *counts))
+
+class IndexSnapshot:
+    # Read-only view of a snapshot written by write_snapshot. The file is mmapped and the arrays are
+    # memoryviews over it, so opening costs the same for 2k or 1M products and pages load on demand.
+    _positions = BloomFilter._positions  # Bit positions must match the filter the snapshot was written from
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, self.source_size, self.source_mtime_ns, self.source_checksum,
+         node_count, slot_count, self.size, self.hash_count) = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a version {VERSION} index snapshot")
+
+        view = self._view = memoryview(self._mmap)
+        offset = HEADER.size
+        columns = []
+        for _ in range(NODE_FIELDS):
+            columns.append(view[offset:offset + node_count * 4].cast("I"))
+            offset += node_count * 4
+        self.first_child, self.child_count, self.first_slot, self.slot_count, self.chars = columns
+        self.slots = view[offset:offset + slot_count * 4].cast("I")
+        offset += slot_count * 4
+        self.bits = view[offset:offset + (self.size + 7) // 8]
+
+    @classmethod
+    def open_if_valid(cls, path: str, source_path: str):  # None when missing, corrupt or built from another source
+        if not os.path.exists(path):
+            return None
+        try:
+            snapshot = cls(path)
+        except (OSError, ValueError, struct.error):
+            return None
+        stat = os.stat(source_path)
+        if snapshot.source_size == stat.st_size and (
+                snapshot.source_mtime_ns == stat.st_mtime_ns
+                or snapshot.source_checksum == file_checksum(source_path)):  # Touched but identical content is fine
+            return snapshot
+        snapshot.close()
+        return None
+
+    def contain(self, item: str):  # Same answers as the BloomFilter it was written from
+        for index in self._positions(item.lower()):
+            if not self.bits[index >> 3] & (1 << (index & 7)):
+                return False
+        return True
+
+    def iter_prefix(self, prefix: str):  # Product ordinals of names starting with prefix, in lexicographic order
+        node = self._find_node(prefix.lower())
+        if node is None:
+            return
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            start = self.first_slot[current]
+            yield from self.slots[start:start + self.slot_count[current]].tolist()
+            first = self.first_child[current]
+            stack.extend(range(first + self.child_count[current] - 1, first - 1, -1))
+
+    def _find_node(self, prefix: str):
+        node = 0
+        for char in prefix:
+            code = ord(char)
+            low = self.first_child[node]
+            high = low + self.child_count[node]
+            while low < high:  # Binary search among the sorted children
+                middle = (low + high) // 2
+                if self.chars[middle] < code:
+                    low = middle + 1
+                else:
+                    high = middle
+            if low == self.first_child[node] + self.child_count[node] or self.chars[low] != code:
+                return None
+            node = low
+        return node
+
+    def close(self):
+        for name in ("first_child", "child_count", "first_slot", "slot_count", "chars", "slots", "bits", "_view"):
+            view = getattr(self, name, None)
+            if view is not None:
+                view.release()
+        self._mmap.close()
+
+    def __str__(self):
+        return f"IndexSnapshot({self.path}, {len(self.first_child)} nodes, {len(self.slots)} products)"
@@ -1,103 +1,617 @@
+import glob
 import json
-from datetime import datetime
+import os
+import threading
+from datetime import date, datetime
+from functools import wraps
+from itertools import islice
 from typing import List, Optional
 from models.product import Product
 from models.receipt import Receipt
-from utilities.bloom_filter import BloomFilter
+from utilities.bloom_filter import BloomFilter, CountingBloomFilter, PrefixBloomFilter
+from utilities.double_array_trie import DoubleArrayTrie
+from utilities.inventory_stats import InventoryStats
+from utilities.index_snapshot import IndexSnapshot, restamp_snapshot, write_snapshot
+from utilities.ngram_index import NgramIndex
+from utilities.persistence_worker import PersistenceWorker
+from utilities.phonetic import PhoneticIndex
+from utilities.prefix_cache import PrefixCache
+from utilities.product_columns import ProductColumns
+from utilities.sorted_index import SortedIndex
+from utilities.spell_index import SymmetricDeleteIndex
+from utilities.storage import FIELD_COLUMNS, storage_for
 from utilities.trie import Trie
+from utilities.write_ahead_log import WriteAheadLog
+
+BLOOM_FP_RATE = 0.01  # Target false-positive rate of the name filter
+LOW_STOCK_THRESHOLD = 30  # Default stock level below which a product counts as low
+CHECKPOINT_EVERY = 500  # Journal records after which a save rewrites the JSON and empties the journal
+JOURNALED_FIELDS = ("quantity", "unit_price")  # Changes the journal can hold, anything else needs a full save
+BLOOM_HEADROOM = 2  # The filter is sized for this many times the catalog, so it's rebuilt rarely as products are added
+# Secondary indexes, each built from the catalog on its first use (see _lazy_index) and maintained by every mutation after
+LAZY_INDEXES = {
+    "phonetic_index": PhoneticIndex,  # Soundex key -> products, for names typed the way they sound
+    "spell_index": lambda: SymmetricDeleteIndex(max_distance=2),  # "Did you mean" corrections for misspelled names
+    "substring_index": NgramIndex,  # Infix search over name, category and ID
+}
+# Built on a worker thread after a background-mode load: the sale window asks for the first two on its first
+# keystroke miss, the inventory window for the substring index on its first search
+WARM_INDEXES = ("spell_index", "phonetic_index", "substring_index")
+
+def expiry_ordinal(expiry_date: str):  # Day number of a YYYY-MM-DD date, unreadable dates sort last
+    try:
+        return date.fromisoformat(expiry_date).toordinal()  # Much cheaper than strptime, which stays for unpadded dates
+    except ValueError:
+        try:
+            return datetime.strptime(expiry_date, "%Y-%m-%d").toordinal()
+        except ValueError:
+            return date.max.toordinal()
+
+def locked(method):  # Runs a mutation while holding the manager's lock, so a background save sees it whole
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
 
 class InventoryManager:
-    def __init__(self, json_file: str = "data/stock.json"):
+    def __init__(self, json_file: str = "data/stock.json", low_stock_threshold: int = LOW_STOCK_THRESHOLD,
+                 journaled: bool = False, background: bool = False, storage=None, receipts_dir: str = "receipts"):
         self.json_file = json_file
+        # Receipts saved before this run, their sales seed the popularity ranking on its first use (later sales are
+        # counted as they happen). Listed now so a receipt saved during this run isn't counted twice
+        self._past_receipts = glob.glob(os.path.join(receipts_dir, "receipt_*.json"))
+        # Where the catalog lives, by default picked from the extension: .json, .invc (binary) or .db (SQLite)
+        self.storage = storage if storage is not None else storage_for(json_file)
+        row_storage = self.storage.row_updates  # Writes each change straight to its row, no journal or snapshot needed
+        self._lock = threading.RLock()  # Held by mutations and by the parts of a save that read in-memory state
+        self._save_lock = threading.Lock()  # One checkpoint at a time, never held by mutations
+        self._catalog_version = 0  # Bumped by adds, deletes and renames, tells a save whether its index snapshot still fits
+        self._checkpoint_requested = False
+        # Journaled mode appends stock and price changes to json_file + ".wal" instead of rewriting the JSON on every save
+        self.wal = WriteAheadLog(json_file + ".wal") if journaled and not row_storage else None
+        self._catalog_dirty = False  # Changes the journal can't hold (adds, deletes, other fields) wait for a checkpoint
         self.products = []
-        self.bloom_filter = BloomFilter(size=1000, hash_count=3)
+        self._progress_shown = 0.0  # Share of the catalog file loaded at the last progress line
+        self.stats = InventoryStats(low_stock_threshold)  # Dashboard counters, updated by every mutation
+        self.columns = ProductColumns()  # Quantity, price, expiry, category and supplier as arrays, for ad hoc reports
+        self.products_by_id = {}  # product_id -> Product
+        self._positions = {}  # product_id -> index in self.products, lets delete_product remove in O(1)
+        self.expiry_ordinals = {}  # product_id -> expiry date as a day number, parsed once when the product arrives
+        self.sorted_indexes = {}  # sort_by -> SortedIndex, built on first use of that view and maintained after
+        # Counting so deleted names can be removed, resized for the catalog once products are loaded
+        self.bloom_filter = CountingBloomFilter.for_capacity(1000, BLOOM_FP_RATE)
+        # Every prefix of every name, lets autocomplete skip prefixes nothing starts with. Also resized after loading
+        self.prefix_filter = PrefixBloomFilter.for_capacity(10_000, BLOOM_FP_RATE)
         self.trie = Trie()
+        self._trie_built = False  # In snapshot mode the live trie waits for a mutation or a search only it can answer
+        self.phonetic_index = None  # LAZY_INDEXES, None until first used
+        self.spell_index = None
+        self.substring_index = None
+        self._index_version = 0  # Bumped by every change the LAZY_INDEXES see, a warm-up build checks it before installing
+        self.prefix_cache = PrefixCache()  # Recent name-ordered autocomplete results, refined as the user types
+        # mmapped trie + bloom filter, skips the index build at startup. Stamped with the catalog file, whole-file storage only
+        self.snapshot_file = None if row_storage else json_file + ".idx"
+        self.snapshot = None  # Open IndexSnapshot while the live indexes have not been built
+        self._snapshot_stale = False  # Names changed since the snapshot on disk was written
+        self.frozen_trie = None  # Read-only DoubleArrayTrie compiled from self.trie, serves name-ordered prefix reads
+        self._frozen_stale = False  # Names changed since frozen_trie was compiled, reads go to the live trie meanwhile
+        self._index_thread = None  # Compiles the frozen trie and writes the snapshot after a load without one
         self.load_products()  # Load products when InventoryManager is created
+        # Background mode turns save_products into a notification, a worker thread merges them into few saves
+        self.persistence = PersistenceWorker(self._persist) if background else None
+        if background:  # Same reason as the worker: keeps the slow index builds off the UI thread
+            threading.Thread(target=self._warm_indexes, name="index-warm", daemon=True).start()
     
-    def load_products(self):  # Load products from JSON file
+    def load_products(self):  # Load products from storage
         try:
-            with open(self.json_file, 'r') as f:  # Open JSON file in read only mode
-                data = json.load(f)
-                for prod_data in data.get("products", []):  # Loop through all products
-                    product = Product(
-                        product_id=prod_data["product_id"],
-                        name=prod_data["name"],
-                        unit_price=prod_data["unit_price"],
-                        quantity=prod_data["quantity_in_stock"],
-                        expiry_date=prod_data["expiry_date"],
-                        supplier=prod_data["supplier"],
-                        category=prod_data.get("category", "")
-                    )
-                    self.products.append(product)
-                    self.bloom_filter.add(product.name)
-                    self.trie.insert(product)
-                    
-                print(f"✓ Loaded {len(self.products)} products")
+            # Rows arrive one at a time, each is indexed and dropped before the next is parsed
+            for prod_data in self.storage.load(progress=self._report_load_progress):  # Loop through all products
+                product = Product(
+                    product_id=prod_data["product_id"],
+                    name=prod_data["name"],
+                    unit_price=prod_data["unit_price"],
+                    quantity=prod_data["quantity_in_stock"],
+                    expiry_date=prod_data["expiry_date"],
+                    supplier=prod_data["supplier"],
+                    category=prod_data.get("category", "")
+                )
+                self._track(product)
+                self.stats.add(product)
+            
+            if self.wal is not None:
+                self._replay_journal()
+            print(f"✓ Loaded {len(self.products)} products")
+            
+            # A snapshot stamped with this exact JSON answers searches right away, otherwise build and save one
+            if self.snapshot_file is not None:
+                self.snapshot = IndexSnapshot.open_if_valid(self.snapshot_file, self.json_file)
+            if self.snapshot is None:
+                self._build_indexes()
+                self._snapshot_stale = True  # Whatever is on disk was built from another file
+                # The frozen trie and the snapshot file are made on a worker thread, the live trie answers meanwhile
+                self._index_thread = threading.Thread(target=self._save_indexes, name="index-save", daemon=True)
+                self._index_thread.start()
         except FileNotFoundError:
             print(f"✗ Error: {self.json_file} not found")
         except Exception as e:
             print(f"✗ Error loading products: {e}")
             
-    def save_products(self):
+    def _report_load_progress(self, fraction: float):  # Every 10% of a file that takes more than one read
+        if fraction < 1.0 and fraction - self._progress_shown >= 0.1:
+            self._progress_shown = fraction
+            print(f"  Loading products... {fraction:.0%} ({len(self.products)} so far)")
+    
+    def _replay_journal(self):  # Re-applies changes made after the last checkpoint, crash recovery
+        replayed = 0
+        for record in self.wal.replay():
+            product = self.products_by_id.get(record.get("id"))
+            if product is None:
+                continue
+            for key in JOURNALED_FIELDS:
+                if key in record:
+                    setattr(product, key, record[key])
+            self.stats.update(product)
+            self._update_columns(product)
+            replayed += 1
+        if replayed:
+            print(f"✓ Replayed {replayed} journaled changes")
+    
+    def _record_change(self, product: Product, fields):  # Writes the current value of fields to the row or the journal
+        if not fields:
+            return
+        if self.storage.row_updates:
+            self.storage.update(product.product_id, {FIELD_COLUMNS.get(key, key): getattr(product, key) for key in fields})
+        elif self.wal is not None and all(key in JOURNALED_FIELDS for key in fields):
+            record = {"id": product.product_id}
+            record.update((key, getattr(product, key)) for key in fields)
+            self.wal.append(record)
+        else:
+            self._catalog_dirty = True  # Only a full save can hold it
+    
+    def save_products(self, checkpoint: bool = False):  # checkpoint forces a full JSON write even in journaled mode
+        if checkpoint:
+            self._checkpoint_requested = True
+        if self.persistence is not None:
+            self.persistence.mark_dirty()
+            return True  # Saved on the worker thread
+        return self._persist()
+    
+    def _persist(self):
+        if self.storage.row_updates:
+            return self.checkpoint()  # Every change already went to its row, the save only ends the batch of edits
+        with self._lock:
+            if (self.wal is not None and not self._catalog_dirty and not self._checkpoint_requested
+                    and len(self.wal) < CHECKPOINT_EVERY):
+                return True  # Every change is already in the journal, which syncs in batches
+        return self.checkpoint()
+    
+    def flush(self):  # Waits until every save_products() so far is on disk, False if one of them failed
+        if self._index_thread is not None:
+            self._index_thread.join()
+        saved = self.persistence.flush() if self.persistence is not None else True
+        if self.wal is not None:
+            self.wal.sync()
+        return saved
+    
+    def close(self):  # Flushes, stops the worker and closes the journal
+        self.flush()
+        if self.persistence is not None:
+            self.persistence.stop()
+        if self.wal is not None:
+            self.wal.close()
+        self.storage.close()
+    
+    def checkpoint(self):  # Writes the whole catalog to storage, the journal starts over
+        if self.storage.row_updates:  # Rows are always current, only the batch of edits ends
+            self._checkpoint_requested = False
+            self._save_indexes()  # Swaps the recompiled frozen trie back in
+            return True
+        with self._save_lock:
+            return self._checkpoint()
+    
+    def _save_indexes(self):  # Frozen trie and snapshot of the catalog as it is now, nothing else to save
+        with self._save_lock:
+            self._refresh_saved_indexes(self._catalog_version)
+    
+    def _checkpoint(self):
+        requested = False
         try:
-            # First read the existing data
-            with open(self.json_file, 'r') as f:
-                data = json.load(f)
+            with self._lock:  # Copy the catalog, the slow part below runs without blocking mutations
+                rows = [p.to_dict() for p in self.products]  # Converting product to dictionary and saving in data
+                version = self._catalog_version
+                requested = self._checkpoint_requested
+                if self.wal is not None:
+                    self.wal.rotate()  # Changes from here on go to a fresh journal
+                self._catalog_dirty = False
+                self._checkpoint_requested = False
             
-            # Update the data
-            data["products"] = [p.to_dict() for p in self.products]  # Converting product to dictionary and saving in data
-            data["metadata"]["total_products"] = len(self.products)  # Total size of products
-            data["metadata"]["last_updated"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")  # Date saved
-        
-            # Then write the updated data
-            with open(self.json_file, 'w') as f:
-                json.dump(data, f, indent=2)  # Writing all product data in a json file
+            if self.wal is not None:
+                self.wal.sync_rotated()  # Off the lock, rotate() left it to here
+            self.storage.save_all(rows)
+            if self.wal is not None:
+                self.wal.discard_rotated()  # Only once the JSON holds every change
             
+            self._refresh_saved_indexes(version)  # A save ends a batch of edits
             print("✓ Inventory saved successfully")
             return True
         except Exception as e:
+            with self._lock:  # Storage is behind the catalog, the next save must write it whole, not trust the journal
+                self._catalog_dirty = True
+                self._checkpoint_requested = self._checkpoint_requested or requested
             print(f"✗ Error saving products: {e}")
             return False
 
-    def search_with_autocomplete(self, prefix: str):
+    def _refresh_saved_indexes(self, version: int):
+        # Recompiles the frozen trie and rewrites (or restamps) the snapshot of the catalog file saved at version.
+        # Only the names are copied under the lock: the trie build, the compile, the sha256 of the catalog and
+        # the file writes all run outside it, and the results are dropped if an add, delete or rename came in between.
+        with self._lock:
+            if version != self._catalog_version:
+                return  # The saved file no longer matches the names, the next save fixes it
+            compile_trie = self.snapshot is None and self._frozen_stale
+            snapshot_stale = self.snapshot_file is not None and (
+                self._snapshot_stale or not os.path.exists(self.snapshot_file))
+            named = [(p.name, p) for p in self.products] if compile_trie or snapshot_stale else []
+        
+        trie = Trie()
+        for name, product in named:
+            trie.insert(product, name)
+        frozen_trie = DoubleArrayTrie.compile(trie) if compile_trie else None
+        written = False
+        if self.snapshot_file is not None:
+            try:
+                if snapshot_stale:
+                    bloom_filter = BloomFilter.for_capacity(len(named), BLOOM_FP_RATE)
+                    bloom_filter.add_many(name for name, _ in named)
+                    write_snapshot(self.snapshot_file, self.json_file, trie, bloom_filter, [p for _, p in named])
+                    written = True
+                else:
+                    restamp_snapshot(self.snapshot_file, self.json_file)  # Only stock or prices changed
+            except OSError as e:
+                print(f"✗ Error saving index snapshot: {e}")
+        
+        with self._lock:
+            if version != self._catalog_version:
+                return
+            if frozen_trie is not None:
+                self.frozen_trie = frozen_trie  # One assignment, a reader sees the old or the new trie
+                self._frozen_stale = False
+            if written:
+                self._snapshot_stale = False
+    
+    def _build_indexes(self):  # Live trie and name filters from self.products, the LAZY_INDEXES wait for their first use
+        self._rebuild_bloom_filters()
+        self._live_trie()
+        self._frozen_stale = True  # Compiled by the next _save_indexes
+    
+    @locked
+    def _live_trie(self):  # The mutable trie, built on first need: fuzzy search and ranking use it even in snapshot mode
+        if not self._trie_built:
+            for product in self.products:
+                self.trie.insert(product)
+            self._trie_built = True
+        return self.trie
+    
+    @locked
+    def _lazy_index(self, name: str):  # One of LAZY_INDEXES, built from the catalog the first time it is asked for
+        index = getattr(self, name)
+        if index is None:
+            index = LAZY_INDEXES[name]()
+            index.build(self.products)
+            setattr(self, name, index)
+        return index
+    
+    def _warm_indexes(self):  # Builds the WARM_INDEXES off the lock, so their first use finds them ready
+        for name in WARM_INDEXES:
+            with self._lock:
+                if getattr(self, name) is not None:
+                    continue
+                products, version = list(self.products), self._index_version
+            index = LAZY_INDEXES[name]()
+            index.build(products)
+            with self._lock:
+                if getattr(self, name) is None and version == self._index_version:
+                    setattr(self, name, index)  # Otherwise a mutation came in between, the first use builds it
+    
+    @locked
+    def _seed_popularity(self):  # Units sold per product in the past receipts, read once
+        paths, self._past_receipts = self._past_receipts, []
+        popularity = self.trie.popularity
+        for path in paths:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    items = json.load(f).get("items", [])
+                for item in items:
+                    popularity[item["product_id"]] = popularity.get(item["product_id"], 0) + item["quantity"]
+            except (OSError, ValueError, KeyError) as e:
+                print(f"✗ Skipping receipt {path}: {e}")
+    
+    def _rebuild_bloom_filters(self):  # Fresh name and prefix filters sized for the catalog with room to grow
+        bloom_filter = CountingBloomFilter.for_capacity(len(self.products) * BLOOM_HEADROOM, BLOOM_FP_RATE)
+        bloom_filter.add_many(product.name for product in self.products)
+        self.bloom_filter = bloom_filter
+        self.prefix_filter = PrefixBloomFilter.for_names([product.name for product in self.products],
+                                                         BLOOM_HEADROOM, BLOOM_FP_RATE)
+    
+    @locked
+    def _ensure_indexes(self):  # Leaves snapshot mode, needed before adds, deletes and renames
+        if self.snapshot is not None:
+            self._build_indexes()
+            self.snapshot.close()
+            self.snapshot = None
+    
+    def search_with_autocomplete(self, prefix: str, limit: Optional[int] = None, rank_by: str = "name",
+                                 max_distance: int = 0, phonetic: bool = False):
         if not prefix.strip():  # Removes leading and trailing whitespaces from prefix
             return []
-        # if not self.bloom_filter.contain(prefix):
-        #     return []
         
-        return self.trie.search_prefix(prefix)
+        if not self._may_match_prefix(prefix):
+            matches = []  # Still goes through the phonetic and fuzzy fallbacks below
+        elif rank_by == "name":
+            matches = list(islice(self.iter_autocomplete(prefix), limit))
+        else:
+            if rank_by == "popularity" and self._past_receipts:
+                self._seed_popularity()
+            matches = self._live_trie().search_prefix(prefix, limit=limit, rank_by=rank_by)  # With a limit only the best matches are returned
+        if phonetic:
+            # Sound-alikes go after the prefix matches, each product once
+            seen = set(map(id, matches))
+            matches = (matches + [p for p in self.search_phonetic(prefix) if id(p) not in seen])[:limit]
+        if not matches and max_distance:
+            matches = self.search_fuzzy(prefix, max_distance, limit)  # Nothing starts with it, the prefix probably has a typo
+        return matches
+    
+    def search_fuzzy(self, query: str, max_distance: int = 1, limit: Optional[int] = None):
+        query = query.strip()
+        # Short queries are within a couple of edits of almost everything, allow one typo per 3 characters
+        max_distance = min(max_distance, len(query) // 3)
+        if max_distance <= 0:
+            return []
+        return self._live_trie().search_fuzzy(query, max_distance, limit=limit, prefix=True)
+    
+    def search_phonetic(self, query: str):  # Products whose name sounds like query, sorted by name
+        return self._lazy_index("phonetic_index").search(query)
+    
+    def search_substring(self, term: str):  # Products whose name, category or ID contains term, in catalog order
+        return self._lazy_index("substring_index").search(term)
+    
+    def suggest(self, query: str, max_distance: int = 2):  # Whole-name corrections, closest first
+        return self._lazy_index("spell_index").lookup(query, max_distance)
+    
+    def iter_autocomplete(self, prefix: str):  # Streams matches in name order, callers take only the rows they show
+        if not prefix.strip() or not self._may_match_prefix(prefix):
+            return iter(())
+        cached = self.prefix_cache.lookup(prefix)
+        if cached is not None:
+            return iter(cached)
+        
+        if self.snapshot is not None:
+            stream = self._iter_snapshot(self.snapshot, prefix)
+        elif self.frozen_trie is not None and not self._frozen_stale:
+            stream = self.frozen_trie.iter_prefix(prefix)
+        else:
+            stream = self.trie.iter_prefix(prefix)
+        return self._cache_when_read(prefix, stream)
+    
+    def _iter_snapshot(self, snapshot, prefix: str):  # Lazy snapshot matches, guarded against a mutation between pages
+        # A mutation closes the snapshot's mmap and may move products, so each row is read under the lock after
+        # checking the snapshot is still open. Once it is closed the live trie, built by that mutation, carries on
+        # after the last name shown: both walk names in the same order.
+        ordinals = snapshot.iter_prefix(prefix)
+        last, shown = None, []  # Lowercase name of the last product yielded, and the products yielded under it
+        while True:
+            with self._lock:
+                if self.snapshot is not snapshot:
+                    break
+                ordinal = next(ordinals, None)
+                if ordinal is None:
+                    return
+                product = self.products[ordinal]
+            name = product.name.lower()
+            if name != last:
+                last, shown = name, []
+            shown.append(product)
+            yield product
+        for product in self.trie.iter_prefix(prefix):
+            name = product.name.lower()
+            if last is None or name > last or name == last and product not in shown:
+                yield product
+    
+    def _cache_when_read(self, prefix: str, stream):  # Passes stream through, caches it if the caller reads all of it
+        # Nothing is read ahead: a page of 10 rows costs 10 rows, and only a result that ended within
+        # prefix_cache.max_results rows, with no name changed meanwhile, is kept for the next keystrokes
+        version = self._catalog_version
+        read = []
+        for product in stream:
+            yield product
+            if read is not None:
+                read.append(product)
+                if len(read) > self.prefix_cache.max_results:
+                    read = None
+        if read is not None and version == self._catalog_version:
+            self.prefix_cache.store(prefix, read)
+    
+    def _may_match_prefix(self, prefix: str):  # False only when no name starts with prefix
+        # The snapshot has no prefix filter (the one here is still empty), its own trie walk answers misses quickly enough
+        return self.snapshot is not None or self.prefix_filter.contain(prefix)
+    
+    def has_product_named(self, name: str):  # Exact, case-insensitive name check
+        name = name.strip()
+        membership = self.snapshot if self.snapshot is not None else self.bloom_filter
+        if not name or not membership.contain(name):
+            return False  # Most unknown names stop here without touching the trie
+        first = next(self.iter_autocomplete(name), None)  # An exact match sorts before longer names with the same prefix
+        return first is not None and first.name.lower() == name.lower()
+    
+    def search_cache_stats(self):  # Hit/refine/miss counters of the autocomplete cache
+        return self.prefix_cache.stats()
+    
+    @property
+    def low_stock_threshold(self):
+        return self.stats.low_stock_threshold
+    
+    @low_stock_threshold.setter
+    def low_stock_threshold(self, threshold: int):
+        self.stats.set_low_stock_threshold(threshold)
+    
+    def statistics(self):  # Totals, low/out of stock counts, stock value and per-category totals, no scan
+        return self.stats.as_dict()
+    
+    def find_products(self, **filters):  # Catalog order, ProductColumns filters such as category="Dairy", quantity_below=10
+        return [self.products[i] for i in self.columns.select(**filters)]
+    
+    def stock_report(self, by: str = "category", **filters):  # Products, units and value per category or supplier
+        return self.columns.breakdown(by, **filters)
     
     def get_products_sorted_by_expiry(self):
-        return sorted(self.products, key=lambda p: datetime.strptime(p.expiry_date, "%Y-%m-%d"))
+        return list(self.sorted_products("expiry"))
+    
+    def sorted_products(self, sort_by: str):  # "expiry", "name", "stock" or "price" order without sorting, else catalog order
+        index = self._sorted_index(sort_by)
+        return iter(index) if index is not None else iter(self.products)
+    
+    def _sorted_index(self, sort_by: str):  # Built on first use, None for an unknown sort
+        index = self.sorted_indexes.get(sort_by)
+        if index is None:
+            keys = {
+                "expiry": lambda p: self.expiry_ordinals[p.product_id],
+                "name": lambda p: p.name,
+                "stock": lambda p: p.quantity,
+                "price": lambda p: p.unit_price,
+            }
+            if sort_by not in keys:
+                return None
+            index = self.sorted_indexes[sort_by] = SortedIndex(keys[sort_by])
+            index.build(self.products)
+        return index
+    
+    def expiring_between(self, start, end):  # Products expiring from start to end inclusive (dates or YYYY-MM-DD), soonest first
+        start, end = (day if isinstance(day, date) else datetime.strptime(day, "%Y-%m-%d") for day in (start, end))
+        return self._sorted_index("expiry").between(start.toordinal(), end.toordinal())
+    
+    def expiring_within(self, days: int):  # Products expiring today or in the next days days, soonest first
+        today = date.today()
+        return self._sorted_index("expiry").between(today.toordinal(), today.toordinal() + days)
     
+    def _update_sorted(self, product: Product):  # Re-place product in every built view after its fields changed
+        for index in self.sorted_indexes.values():
+            index.update(product)
+    
+    @locked
     def update_product_quantity(self, product: Product, quantity_sold: int):
+        if self.products_by_id.get(product.product_id) is not product:  # Deleted (its ID maybe reused) since it went in a cart
+            raise ValueError(f"{product.name} ({product.product_id}) is no longer in the inventory")
         if quantity_sold > product.quantity:
             raise ValueError(f"Cannot sell more than available stock ({product.quantity})")
         product.quantity = product.quantity - quantity_sold
+        self.trie.record_sale(product, quantity_sold)  # Keeps stock and popularity rankings up to date
+        self.columns.set_quantity(self._positions[product.product_id], product.quantity)
+        self._record_change(product, ("quantity",))
+        if "stock" in self.sorted_indexes:
+            self.sorted_indexes["stock"].update(product)
+        self.stats.update(product)
         
-    def add_product(self, product: Product):
+    def get(self, product_id: str) -> Optional[Product]:  # None when no product has this ID
+        return self.products_by_id.get(product_id)
+    
+    def _track(self, product: Product):  # Appends to the catalog and the ID index together
+        self._positions[product.product_id] = len(self.products)
+        self.products_by_id[product.product_id] = product
+        self.expiry_ordinals[product.product_id] = expiry_ordinal(product.expiry_date)
         self.products.append(product)
+        self.columns.append(product, self.expiry_ordinals[product.product_id])
+    
+    def _update_columns(self, product: Product):
+        self.columns.update(self._positions[product.product_id], product, self.expiry_ordinals[product.product_id])
+    
+    @locked
+    def add_product(self, product: Product):
+        if product.product_id in self.products_by_id:
+            raise ValueError(f"Product ID '{product.product_id}' already exists")
+        self._ensure_indexes()
+        self._track(product)
+        if self.storage.row_updates:
+            self.storage.insert(product.to_dict())
+        else:
+            self._catalog_dirty = True
+        self._catalog_version += 1
+        for index in self.sorted_indexes.values():
+            index.add(product)
+        self.stats.add(product)
+        self._index_product(product)
+        self._snapshot_stale = True
+        self._frozen_stale = True
+    
+    @locked
+    def update_product(self, product_id: str, **kwargs):
+        product = self.products_by_id.get(product_id)
+        if product is None:
+            return False
+        if "name" in kwargs:
+            self._ensure_indexes()
+        old_name = product.name
+        try:
+            for key, value in kwargs.items():
+                if hasattr(product, key):
+                    setattr(product, key, value)
+        finally:  # A rejected value can come after accepted ones, count what was actually set
+            self._update_sorted(product)
+            self.stats.update(product)
+            self._update_columns(product)
+            self._record_change(product, [key for key in kwargs if hasattr(product, key)])
+            if product.name != old_name:  # Also when a later value was rejected, the rename itself went through
+                self._reindex_renamed(product, old_name)
+                self._catalog_version += 1
+                self._snapshot_stale = True
+                self._frozen_stale = True
+            else:
+                self.trie.refresh(product)
+        return True
+    
+    def _index_product(self, product: Product):  # Adding a product to every search index
+        self._index_version += 1
+        self.prefix_cache.invalidate(product.name)
         self.bloom_filter.add(product.name)
+        self.prefix_filter.add(product.name)
+        if self.bloom_filter.is_full() or self.prefix_filter.is_full():
+            self._rebuild_bloom_filters()  # Catalog outgrew the filters, resize instead of letting false positives climb
         self.trie.insert(product)
+        for index in (self.phonetic_index, self.spell_index, self.substring_index):
+            if index is not None:
+                index.add(product)
     
-    def update_product(self, product_id: str, **kwargs):
-        for product in self.products:
-            if product.product_id == product_id:
-                for key, value in kwargs.items():
-                    if hasattr(product, key):
-                        setattr(product, key, value)
-                return True
-        return False
+    def _unindex_product(self, product: Product, name: Optional[str] = None):  # name is the one it was indexed under
+        name = name if name is not None else product.name
+        self._index_version += 1
+        self.prefix_cache.invalidate(name)
+        self.bloom_filter.remove(name)
+        self.prefix_filter.remove(name)
+        self.trie.remove(product, name)
+        for index in (self.phonetic_index, self.spell_index):
+            if index is not None:
+                index.remove(product, name)
+        if self.substring_index is not None:
+            self.substring_index.remove(product)
+    
+    def _reindex_renamed(self, product: Product, old_name: str):  # Each index only touches the old and new name
+        self._index_version += 1
+        self.prefix_cache.invalidate(old_name)
+        self.prefix_cache.invalidate(product.name)
+        self.bloom_filter.remove(old_name)
+        self.bloom_filter.add(product.name)
+        self.prefix_filter.remove(old_name)
+        self.prefix_filter.add(product.name)
+        self.trie.rename(product, old_name)
+        for index in (self.phonetic_index, self.spell_index):
+            if index is not None:
+                index.remove(product, old_name)
+                index.add(product)
+        if self.substring_index is not None:
+            self.substring_index.update(product)
     
     def display_inventory(self, sort_by="expiry"):  # By default, products are sorted by expiry_date
-        if sort_by == "expiry":
-            products = self.get_products_sorted_by_expiry()
-        elif sort_by == "name":
-            products = sorted(self.products, key=lambda p: p.name)
-        elif sort_by == "stock":
-            products = sorted(self.products, key=lambda p: p.quantity)
-        else:
-            products = self.products
+        products = self.sorted_products(sort_by)
         
         print("\n" + "=" * 100)
         print(" " * 40 + "INVENTORY")
@@ -106,16 +620,80 @@ class InventoryManager:
         print("-" * 100)
         
         for p in products:
-            stock_status = "⚠ LOW" if p.quantity < 30 else str(p.quantity)
+            stock_status = "⚠ LOW" if p.quantity < self.low_stock_threshold else str(p.quantity)
             print(f"{p.product_id:<8} {p.name:<18} {p.category:<15} {stock_status:<8} "
                   f"FCFA{p.unit_price:<9.2f} {p.expiry_date:<12} {p.supplier:<15}")
         
         print("=" * 100 + "\n")
         
+    def display_expiry_report(self, days: int = 7):
+        products = self.expiring_within(days)
+        today = date.today().toordinal()
+        
+        print("\n" + "=" * 70)
+        print(" " * 20 + f"EXPIRING IN THE NEXT {days} DAYS")
+        print("=" * 70)
+        print(f"{'ID':<8} {'Name':<18} {'Stock':<8} {'Expiry':<12} {'Days left':<10}")
+        print("-" * 70)
+        
+        for p in products:
+            print(f"{p.product_id:<8} {p.name:<18} {p.quantity:<8} {p.expiry_date:<12} "
+                  f"{self.expiry_ordinals[p.product_id] - today:<10}")
+        
+        print(f"{len(products)} product(s)")
+        print("=" * 70 + "\n")
+    
+    def display_stock_report(self, by: str = "category", days: int = 7):  # Every figure is one pass over the columns
+        report = self.stock_report(by)
+        low = self.stock_report(by, quantity_below=self.low_stock_threshold)
+        today = date.today().toordinal()
+        
+        print("\n" + "=" * 80)
+        print(" " * 30 + f"STOCK BY {by.upper()}")
+        print("=" * 80)
+        print(f"{by.capitalize():<20} {'Products':>10} {'Low stock':>10} {'Units':>12} {'Value (FCFA)':>18}")
+        print("-" * 80)
+        
+        for name, totals in sorted(report.items(), key=lambda item: -item[1]["value"]):
+            print(f"{name or '-':<20} {totals['products']:>10} {low.get(name, {}).get('products', 0):>10} "
+                  f"{totals['units']:>12} {totals['value']:>18,.2f}")
+        
+        print("-" * 80)
+        print(f"{'Total':<20} {len(self.columns):>10} {self.columns.count(quantity_below=self.low_stock_threshold):>10} "
+              f"{self.columns.units():>12} {self.columns.stock_value():>18,.2f}")
+        print(f"Stock expiring in the next {days} days: FCFA "
+              f"{self.columns.stock_value(expiring_from=today, expiring_to=today + days):,.2f}")
+        print("=" * 80 + "\n")
+        
     def delete_product(self, product_id: str) -> bool:
-        for i, product in enumerate(self.products):
-             if product.product_id == product_id:
-                del self.products[i]
-                self.save_products()
-                return True
-        return False
\ No newline at end of file
+        if not self._delete_product(product_id):
+            return False
+        self.save_products()  # Not under the lock: a save takes the save lock first, then this one
+        return True
+    
+    @locked
+    def _delete_product(self, product_id: str) -> bool:
+        product = self.products_by_id.pop(product_id, None)
+        if product is None:
+            return False
+        self._ensure_indexes()
+        # The last product moves into the freed slot instead of shifting everything after it
+        i = self._positions.pop(product_id)
+        last = self.products.pop()
+        if last is not product:
+            self.products[i] = last
+            self._positions[last.product_id] = i
+        self.columns.remove(i)
+        del self.expiry_ordinals[product_id]
+        for index in self.sorted_indexes.values():
+            index.remove(product)
+        self.stats.remove(product)
+        if self.storage.row_updates:
+            self.storage.delete(product_id)
+        else:
+            self._catalog_dirty = True
+        self._catalog_version += 1
+        self._unindex_product(product)
+        self._snapshot_stale = True
+        self._frozen_stale = True
+        return True
\ No newline at end of file
@@ -0,0 +1,59 @@
+class InventoryStats:
+    # Dashboard aggregates kept up to date one product at a time, so reading them never scans the catalog.
+    # Every product's last counted (quantity, unit_price, category) is remembered: an edit takes the old
+    # contribution out and puts the new one in, whatever fields changed.
+    def __init__(self, low_stock_threshold: int = 30):
+        self.low_stock_threshold = low_stock_threshold  # Stock below this is low, out of stock included
+        self.total = 0
+        self.low_stock = 0
+        self.out_of_stock = 0
+        self.stock_value = 0.0  # Sum of quantity * unit_price
+        self.categories = {}  # category -> {"products", "units", "value"}
+        self.counted = {}  # id(product) -> (quantity, unit_price, category) it was counted with
+
+    def build(self, products):
+        self.__init__(self.low_stock_threshold)
+        for product in products:
+            self.add(product)
+
+    def add(self, product):
+        self._count(product.quantity, product.unit_price, product.category, 1)
+        self.counted[id(product)] = (product.quantity, product.unit_price, product.category)
+
+    def remove(self, product):
+        counted = self.counted.pop(id(product), None)
+        if counted is not None:
+            self._count(*counted, -1)
+
+    def update(self, product):  # Call after any of product's fields changed
+        self.remove(product)
+        self.add(product)
+
+    def set_low_stock_threshold(self, threshold: int):  # Only the low-stock count depends on it, recount that one
+        self.low_stock_threshold = threshold
+        self.low_stock = sum(1 for quantity, _, _ in self.counted.values() if quantity < threshold)
+
+    def _count(self, quantity, unit_price, category, sign):
+        self.total += sign
+        self.low_stock += sign * (quantity < self.low_stock_threshold)
+        self.out_of_stock += sign * (quantity == 0)
+        self.stock_value += sign * quantity * unit_price
+        totals = self.categories.setdefault(category, {"products": 0, "units": 0, "value": 0.0})
+        totals["products"] += sign
+        totals["units"] += sign * quantity
+        totals["value"] += sign * quantity * unit_price
+        if not totals["products"]:
+            del self.categories[category]
+
+    def as_dict(self):
+        return {
+            "total_products": self.total,
+            "low_stock": self.low_stock,
+            "out_of_stock": self.out_of_stock,
+            "stock_value": round(self.stock_value, 2),  # Adding and taking out floats leaves tiny remainders
+            "categories": {name: dict(totals, value=round(totals["value"], 2)) for name, totals in self.categories.items()},
+        }
+
+    def __str__(self):
+        return (f"InventoryStats({self.total} products, {self.low_stock} low, {self.out_of_stock} out, "
+                f"value {self.stock_value:.2f})")
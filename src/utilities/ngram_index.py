@@ -0,0 +1,69 @@
+class NgramIndex:
+    # Inverted index for "term appears anywhere in name/category/ID" searches.
+    # Every field is split into all its substrings of length 1..n (grams), each gram points to the
+    # products containing it. Terms up to n characters are answered by one posting set, longer terms
+    # intersect the sets of their n-grams and only the survivors are checked with a real substring test.
+    def __init__(self, n: int = 3):
+        self.n = n
+        self.postings = {}  # gram -> set of products
+        self.fields = {}  # product -> normalized (name, category, product_id)
+        self.order = {}  # product -> insertion number, results come back in catalog order
+        self._next_order = 0
+
+    def build(self, products):  # Results come back in the order of products
+        for product in products:
+            self.add(product)
+
+    def add(self, product):
+        fields = (product.name.lower(), product.category.lower(), product.product_id.lower())
+        self.fields[product] = fields
+        if product not in self.order:
+            self.order[product] = self._next_order
+            self._next_order += 1
+        for gram in self._grams(fields):
+            self.postings.setdefault(gram, set()).add(product)
+
+    def remove(self, product):
+        fields = self.fields.pop(product, None)
+        if fields is None:
+            return
+        del self.order[product]
+        for gram in self._grams(fields):
+            products = self.postings[gram]
+            products.discard(product)
+            if not products:
+                del self.postings[gram]
+
+    def update(self, product):  # Re-index after a rename, keeping the product's place in the results
+        position = self.order.get(product)
+        self.remove(product)
+        if position is not None:
+            self.order[product] = position
+        self.add(product)
+
+    def search(self, term: str):
+        term = term.lower()
+        if not term:
+            return sorted(self.fields, key=self.order.__getitem__)
+
+        if len(term) <= self.n:
+            matches = self.postings.get(term, ())
+        else:
+            grams = sorted((self.postings.get(term[i:i + self.n], set()) for i in range(len(term) - self.n + 1)), key=len)
+            candidates = grams[0].intersection(*grams[1:])
+            matches = [product for product in candidates if any(term in field for field in self.fields[product])]
+        return sorted(matches, key=self.order.__getitem__)
+
+    def _grams(self, fields):
+        grams = set()
+        for field in fields:
+            for size in range(1, self.n + 1):
+                for i in range(len(field) - size + 1):
+                    grams.add(field[i:i + size])
+        return grams
+
+    def __len__(self):
+        return len(self.fields)
+
+    def __str__(self):
+        return f"NgramIndex(n={self.n}, products={len(self.fields)}, grams={len(self.postings)})"
@@ -0,0 +1,83 @@
+import threading
+import time
+
+class PersistenceWorker:
+    # Runs save() on a daemon thread so callers never wait for the disk. mark_dirty() calls that come
+    # within delay seconds of each other are merged into one save; a steady stream of them still
+    # saves at least every max_delay seconds. flush() skips the wait and returns once nothing is pending.
+    def __init__(self, save, delay: float = 0.5, max_delay: float = 5.0):
+        self.save = save  # Called with no arguments on the worker thread, returns True on success
+        self.delay = delay
+        self.max_delay = max_delay
+        self.saves = 0  # Completed save() calls
+        self.failures = 0  # save() calls that returned False or raised
+        self.merged = 0  # mark_dirty() calls that didn't need a save of their own
+        self.last_error = None
+        self._condition = threading.Condition()
+        self._dirty = False
+        self._saving = False
+        self._flushing = False
+        self._stopping = False
+        self._first_mark = None  # When the pending burst started
+        self._last_mark = None
+        self._thread = threading.Thread(target=self._run, name="persistence", daemon=True)
+        self._thread.start()
+
+    def mark_dirty(self):  # Returns right away, the save happens later on the worker thread
+        with self._condition:
+            now = time.monotonic()
+            if self._dirty:
+                self.merged += 1
+            else:
+                self._dirty = True
+                self._first_mark = now
+            self._last_mark = now
+            self._condition.notify_all()
+
+    def flush(self, timeout: float = None):  # Saves whatever is pending now, False if timeout ran out or a save failed
+        with self._condition:
+            failures = self.failures
+            self._flushing = True
+            self._condition.notify_all()
+            done = self._condition.wait_for(lambda: not self._dirty and not self._saving, timeout)
+            self._flushing = False
+            return done and self.failures == failures
+
+    def stop(self, timeout: float = None):  # Flushes, then ends the thread
+        self.flush(timeout)
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._dirty or self._stopping)
+                if self._stopping and not self._dirty:
+                    return
+                while not (self._flushing or self._stopping):  # Wait for the burst to go quiet
+                    now = time.monotonic()
+                    wait = min(self._last_mark + self.delay, self._first_mark + self.max_delay) - now
+                    if wait <= 0:
+                        break
+                    self._condition.wait(wait)
+                self._dirty = False
+                self._saving = True
+            failed = False
+            try:
+                if not self.save():
+                    self.last_error = "save failed"
+                    failed = True
+            except Exception as e:  # Keeps the thread alive for the next save
+                self.last_error = e
+                failed = True
+                print(f"✗ Background save failed: {e}")
+            with self._condition:
+                self._saving = False
+                self.saves += 1
+                self.failures += failed
+                self._condition.notify_all()
+
+    def __str__(self):
+        return f"PersistenceWorker({self.saves} saves, {self.merged} merged marks, dirty={self._dirty})"
@@ -0,0 +1,58 @@
+SOUNDEX_CODES = {}
+for letters, digit in (("bfpv", "1"), ("cgjkqsxz", "2"), ("dt", "3"), ("l", "4"), ("mn", "5"), ("r", "6")):
+    for letter in letters:
+        SOUNDEX_CODES[letter] = digit
+
+# Spellings that sound the same, folded before coding so "Fone"/"Phone" or "Kwik"/"Quick" get the same key
+SOUND_ALIKES = (("ph", "f"), ("qu", "kw"), ("ck", "k"))
+SILENT_STARTS = (("kn", "n"), ("wr", "r"), ("wh", "w"), ("ps", "s"))  # Only silent at the start of a word
+
+def soundex(word: str):  # American Soundex of word after folding sound-alike spellings, "" for no letters
+    word = "".join(char for char in word.lower() if char.isalpha())
+    for spelling, sound in SILENT_STARTS:
+        if word.startswith(spelling):
+            word = sound + word[len(spelling):]
+    for spelling, sound in SOUND_ALIKES:
+        word = word.replace(spelling, sound)
+    if not word:
+        return ""
+
+    code = word[0].upper()
+    previous = SOUNDEX_CODES.get(word[0], "")
+    for char in word[1:]:
+        digit = SOUNDEX_CODES.get(char, "")
+        if digit and digit != previous:
+            code += digit
+            if len(code) == 4:
+                break
+        if char not in "hw":  # h and w don't separate letters with the same code, vowels do
+            previous = digit
+    return code.ljust(4, "0")
+
+class PhoneticIndex:
+    # Soundex key -> products, so a name typed the way it sounds is one dict lookup away
+    def __init__(self):
+        self.codes = {}  # Soundex key -> products, in the order they were added
+
+    def build(self, products):
+        for product in products:
+            self.add(product)
+
+    def add(self, product):
+        code = soundex(product.name)
+        if code:
+            self.codes.setdefault(code, []).append(product)
+
+    def remove(self, product, name: str = None):  # name defaults to the product's current name
+        code = soundex(name if name is not None else product.name)
+        products = self.codes.get(code)
+        if products and product in products:
+            products.remove(product)
+            if not products:
+                del self.codes[code]
+
+    def search(self, query: str):  # Sound-alike products sorted by name, so the order is stable between calls
+        return sorted(self.codes.get(soundex(query), ()), key=lambda p: (p.name.lower(), p.product_id))
+
+    def __str__(self):
+        return f"PhoneticIndex({len(self.codes)} codes)"
@@ -0,0 +1,77 @@
+from collections import OrderedDict
+
+class PrefixCache:
+    # Small LRU of complete, name-ordered prefix results for one search box.
+    # Typing "s", "sc", "sca" only needs the trie for the first keystroke: a longer prefix is answered
+    # by filtering the cached result of the previous (or any shorter) prefix, and backspace is a plain hit.
+    # Only results a caller read to the end are stored, and only up to max_results (about one page of the
+    # sale window): bigger ones are streamed straight from the trie, refining them would cost more than the walk.
+    def __init__(self, capacity: int = 64, max_results: int = 50):
+        self.capacity = capacity
+        self.max_results = max_results
+        self.entries = OrderedDict()  # lowercase prefix -> list of products in name order
+        self.last_prefix = None
+        self.hits = 0  # Served as cached
+        self.refined = 0  # Filtered from a shorter cached prefix
+        self.misses = 0  # Had to go to the trie
+
+    def lookup(self, prefix: str):  # Cached or refined result, None on a miss
+        key = prefix.lower()
+        results = self.entries.get(key)
+        if results is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+        else:
+            parent = self._cached_ancestor(key)
+            if parent is None:
+                self.misses += 1
+                return None
+            results = [product for product in self.entries[parent] if product.name.lower().startswith(key)]
+            self.refined += 1
+            self._put(key, results)
+        self.last_prefix = key
+        return results
+
+    def store(self, prefix: str, results):  # Result of a miss, must hold every match of prefix
+        key = prefix.lower()
+        self.last_prefix = key
+        if len(results) <= self.max_results:
+            self._put(key, results)
+
+    def invalidate(self, name: str = None):  # Drops every prefix of name, or everything when no name is given
+        if name is None:
+            self.entries.clear()
+            return
+        name = name.lower()
+        for key in [key for key in self.entries if name.startswith(key)]:
+            del self.entries[key]
+
+    def stats(self):
+        lookups = self.hits + self.refined + self.misses
+        return {
+            "hits": self.hits,
+            "refined": self.refined,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.refined) / lookups if lookups else 0.0,
+            "entries": len(self.entries),
+        }
+
+    def _cached_ancestor(self, key: str):  # Longest cached prefix of key, the previous keystroke first
+        last = self.last_prefix
+        if last is not None and key.startswith(last) and last in self.entries:
+            return last
+        for end in range(len(key) - 1, 0, -1):
+            if key[:end] in self.entries:
+                return key[:end]
+        return None
+
+    def _put(self, key: str, results):
+        self.entries[key] = results
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+
+    def __str__(self):
+        stats = self.stats()
+        return (f"PrefixCache({stats['entries']}/{self.capacity} prefixes, "
+                f"hit rate {stats['hit_rate']:.0%}, {stats['misses']} misses)")
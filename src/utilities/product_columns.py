@@ -0,0 +1,155 @@
+import operator
+from array import array
+from itertools import compress
+
+try:
+    import numpy
+except ImportError:  # Optional, the same queries run over the array columns with builtins
+    numpy = None
+
+class ProductColumns:
+    # Column-wise copy of the fields reports aggregate over, parallel to InventoryManager.products: position i
+    # of every column describes products[i]. Numbers live in typed arrays (no Product, property or boxing per
+    # value), category and supplier as small integer codes into a dictionary of their distinct values.
+    # With NumPy installed the queries run on zero-copy views of the arrays, otherwise on map/sum/compress.
+    # Filters (all optional, combined with "and"): category, supplier, quantity_below, quantity_at_least,
+    # expiring_from, expiring_to (day ordinals, inclusive).
+    def __init__(self):
+        self.quantity = array("q")
+        self.unit_price = array("d")
+        self.expiry = array("q")  # Day ordinal, see inventory_manager.expiry_ordinal
+        self.category = array("I")  # Code into category_values
+        self.supplier = array("I")
+        self.category_values = []  # code -> category, codes are never reused
+        self.supplier_values = []
+        self._category_codes = {}  # category -> code
+        self._supplier_codes = {}
+
+    def build(self, products, ordinals):  # ordinals: expiry ordinal of each product, same order
+        self.__init__()
+        for product, ordinal in zip(products, ordinals):
+            self.append(product, ordinal)
+
+    def append(self, product, ordinal: int):
+        self.quantity.append(product.quantity)
+        self.unit_price.append(product.unit_price)
+        self.expiry.append(ordinal)
+        self.category.append(self._code(product.category, self.category_values, self._category_codes))
+        self.supplier.append(self._code(product.supplier, self.supplier_values, self._supplier_codes))
+
+    def update(self, position: int, product, ordinal: int):  # Call after any of product's fields changed
+        self.quantity[position] = product.quantity
+        self.unit_price[position] = product.unit_price
+        self.expiry[position] = ordinal
+        self.category[position] = self._code(product.category, self.category_values, self._category_codes)
+        self.supplier[position] = self._code(product.supplier, self.supplier_values, self._supplier_codes)
+
+    def set_quantity(self, position: int, quantity: int):  # The sale path, one store
+        self.quantity[position] = quantity
+
+    def remove(self, position: int):  # Same swap-pop as the product list: the last row moves into position
+        for column in (self.quantity, self.unit_price, self.expiry, self.category, self.supplier):
+            last = column.pop()
+            if position < len(column):
+                column[position] = last
+
+    def _code(self, value: str, values, codes):
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(values)
+            values.append(value)
+        return code
+
+    def __len__(self):
+        return len(self.quantity)
+
+    # Queries
+
+    def select(self, **filters):  # Positions matching filters, in catalog order
+        mask = self._mask(**filters)
+        if mask is None:
+            return list(range(len(self)))
+        if numpy is not None:
+            return numpy.flatnonzero(mask).tolist()
+        return list(compress(range(len(self)), mask))
+
+    def count(self, **filters):
+        mask = self._mask(**filters)
+        if mask is None:
+            return len(self)
+        return int(mask.sum()) if numpy is not None else sum(mask)
+
+    def units(self, **filters):  # Units in stock
+        mask = self._mask(**filters)
+        if numpy is not None:
+            quantity = self._view(self.quantity)
+            return int(quantity.sum() if mask is None else quantity[mask].sum())
+        return sum(self.quantity if mask is None else compress(self.quantity, mask))
+
+    def stock_value(self, **filters):  # Sum of quantity * unit_price
+        mask = self._mask(**filters)
+        if numpy is not None:
+            quantity, unit_price = self._view(self.quantity), self._view(self.unit_price)
+            if mask is not None:
+                quantity, unit_price = quantity[mask], unit_price[mask]
+            return float(numpy.dot(quantity, unit_price))
+        values = map(operator.mul, self.quantity, self.unit_price)
+        return sum(values if mask is None else compress(values, mask))
+
+    def breakdown(self, by: str = "category", **filters):  # {category or supplier: {"products", "units", "value"}}
+        codes, values = (self.category, self.category_values) if by == "category" else (self.supplier, self.supplier_values)
+        mask = self._mask(**filters)
+        if numpy is not None:
+            codes, quantity, unit_price = self._view(codes), self._view(self.quantity), self._view(self.unit_price)
+            if mask is not None:
+                codes, quantity, unit_price = codes[mask], quantity[mask], unit_price[mask]
+            products = numpy.bincount(codes, minlength=len(values))
+            units = numpy.bincount(codes, weights=quantity, minlength=len(values))
+            value = numpy.bincount(codes, weights=quantity * unit_price, minlength=len(values))
+            return {values[code]: {"products": int(products[code]), "units": int(units[code]), "value": float(value[code])}
+                    for code in numpy.flatnonzero(products).tolist()}
+        rows = zip(codes, self.quantity, self.unit_price)
+        products, units, value = [0] * len(values), [0] * len(values), [0.0] * len(values)  # Indexed by code
+        for code, quantity, unit_price in (rows if mask is None else compress(rows, mask)):
+            products[code] += 1
+            units[code] += quantity
+            value[code] += quantity * unit_price
+        return {values[code]: {"products": products[code], "units": units[code], "value": value[code]}
+                for code in range(len(values)) if products[code]}
+
+    def _mask(self, category=None, supplier=None, quantity_below=None, quantity_at_least=None,
+              expiring_from=None, expiring_to=None):
+        # One bool per row (a NumPy array or a list), None when no filter is given
+        tests = []  # An unknown category or supplier gets the next free code, which no row has
+        if category is not None:
+            tests.append((self.category, operator.eq, self._category_codes.get(category, len(self.category_values))))
+        if supplier is not None:
+            tests.append((self.supplier, operator.eq, self._supplier_codes.get(supplier, len(self.supplier_values))))
+        if quantity_below is not None:
+            tests.append((self.quantity, operator.lt, quantity_below))
+        if quantity_at_least is not None:
+            tests.append((self.quantity, operator.ge, quantity_at_least))
+        if expiring_from is not None:
+            tests.append((self.expiry, operator.ge, expiring_from))
+        if expiring_to is not None:
+            tests.append((self.expiry, operator.le, expiring_to))
+        mask = None
+        for column, compare, bound in tests:
+            if numpy is not None:
+                matches = compare(self._view(column), bound)
+                mask = matches if mask is None else mask & matches
+            else:
+                # bound.__gt__(x) is x < bound and so on, which keeps the loop inside map
+                matches = map(self._reflected[compare](bound), column)
+                mask = list(matches) if mask is None else list(map(operator.and_, mask, matches))
+        return mask
+
+    _reflected = {operator.eq: lambda bound: bound.__eq__, operator.lt: lambda bound: bound.__gt__,
+                  operator.ge: lambda bound: bound.__le__, operator.le: lambda bound: bound.__ge__}
+
+    def _view(self, column):  # NumPy array sharing the column's memory, dropped before the column changes size
+        return numpy.frombuffer(column, dtype=column.typecode) if len(column) else numpy.zeros(0, column.typecode)
+
+    def __str__(self):
+        return (f"ProductColumns({len(self)} rows, {len(self.category_values)} categories, "
+                f"{len(self.supplier_values)} suppliers, numpy={'yes' if numpy is not None else 'no'})")
@@ -0,0 +1,161 @@
+import heapq
+from itertools import islice
+from utilities.trie import Trie
+
+class RadixNode:
+    __slots__ = ("label", "children", "products")
+
+    def __init__(self, label: str = ""):
+        self.label = label  # Characters on the edge leading to this node
+        self.children = None  # first char of the child's label -> child, None while the node is a leaf
+        self.products = None  # Every product with the name ending here, None while there is none
+
+class RadixTrie:
+    # Compressed (Patricia) version of Trie: chains of single-child nodes are merged into one edge label,
+    # so the node count grows with the number of names instead of the number of characters
+    RANKINGS = Trie.RANKINGS
+    _rank_key = Trie._rank_key
+
+    def __init__(self):
+        self.root = RadixNode()
+        self.popularity = {}  # product_id -> units sold, used by rank_by="popularity"
+        self.node_count = 1
+
+    def insert(self, product, name: str = None):  # Splits an edge where the name leaves it, name defaults to the current one
+        word = (product.name if name is None else name).lower()
+        node = self.root
+        i = 0
+
+        while i < len(word):
+            child = node.children.get(word[i]) if node.children else None
+            if child is None:  # Nothing shares this branch yet, hang the rest of the name on one edge
+                child = RadixNode(word[i:])
+                if node.children is None:
+                    node.children = {}
+                node.children[word[i]] = child
+                self.node_count += 1
+                node = child
+                break
+
+            label = child.label
+            common = 1
+            while common < len(label) and i + common < len(word) and label[common] == word[i + common]:
+                common += 1
+
+            if common < len(label):  # Split the edge at the first differing character
+                middle = RadixNode(label[:common])
+                child.label = label[common:]
+                middle.children = {child.label[0]: child}
+                node.children[word[i]] = middle
+                self.node_count += 1
+                child = middle
+
+            node = child
+            i += common
+
+        if node.products is None:
+            node.products = [product]
+        elif product not in node.products:
+            node.products.append(product)
+
+    def remove(self, product, name: str = None):  # Removing a product, name defaults to its current name
+        word = (name if name is not None else product.name).lower()
+        path = [self.root]
+        i = 0
+        while i < len(word):
+            child = path[-1].children.get(word[i]) if path[-1].children else None
+            if child is None or not word.startswith(child.label, i):
+                return False
+            path.append(child)
+            i += len(child.label)
+
+        node = path[-1]
+        if node.products is None or product not in node.products:  # The name belongs to other products (or nobody)
+            return False
+        node.products.remove(product)
+        if node.products or node is self.root:
+            return True
+        node.products = None
+
+        # Drop the emptied leaf, then merge whichever node is left with a single child and no products into that
+        # child, so every inner node keeps either products or a branch like insert leaves them
+        if not node.children:
+            parent = path[-2]
+            del parent.children[node.label[0]]
+            if not parent.children:
+                parent.children = None
+            self.node_count -= 1
+            path.pop()
+            node = parent
+        if node is not self.root and node.products is None and node.children and len(node.children) == 1:
+            (child,) = node.children.values()
+            child.label = node.label + child.label
+            path[-2].children[node.label[0]] = child
+            self.node_count -= 1
+        return True
+
+    def rename(self, product, old_name: str):  # Moving a product whose name already changed to its new path
+        self.remove(product, old_name)
+        self.insert(product)
+
+    def refresh(self, product):  # Nothing is cached per node, kept for API parity with Trie
+        pass
+
+    def record_sale(self, product, quantity: int):
+        self.popularity[product.product_id] = self.popularity.get(product.product_id, 0) + quantity
+
+    def search_prefix(self, prefix: str, limit: int = None, rank_by: str = "name"):
+        if rank_by not in self.RANKINGS:
+            raise ValueError(f"Unknown ranking '{rank_by}', expected one of {self.RANKINGS}")
+
+        node = self._find_node(prefix.lower())
+        if node is None:
+            return []
+
+        if limit is None:
+            products = self._collect_products(node)
+            if rank_by != "name":
+                products.sort(key=lambda p: self._rank_key(p, rank_by))
+            return products
+        if rank_by == "name":
+            return list(islice(self._iter_subtree(node), limit))
+        return heapq.nsmallest(limit, self._collect_products(node), key=lambda p: self._rank_key(p, rank_by))
+
+    def iter_prefix(self, prefix: str):  # Lazily yields products starting with prefix in lexicographic order
+        node = self._find_node(prefix.lower())
+        if node is None:
+            return iter(())
+        return self._iter_subtree(node)
+
+    def _find_node(self, prefix: str):  # Node whose subtree holds every name starting with prefix
+        node = self.root
+        i = 0
+        while i < len(prefix):
+            child = node.children.get(prefix[i]) if node.children else None
+            if child is None:
+                return None
+            label = child.label
+            if prefix.startswith(label, i):
+                i += len(label)
+            elif not label.startswith(prefix[i:]):  # The prefix ends inside the edge only if it matches it
+                return None
+            else:
+                i = len(prefix)
+            node = child
+        return node
+
+    def _iter_subtree(self, node):  # Iterative pre-order walk, edges can be long so avoid recursing per node
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            if current.products is not None:
+                yield from current.products
+            children = current.children
+            if children:
+                stack.extend(children[char] for char in sorted(children, reverse=True))
+
+    def _collect_products(self, node):
+        return list(self._iter_subtree(node))
+
+    def __str__(self):
+        return f"RadixTrie({self.node_count} nodes)"
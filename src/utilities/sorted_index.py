@@ -0,0 +1,65 @@
+from bisect import bisect_left, bisect_right
+
+class SortedIndex:
+    # Products kept sorted by key(product), so a sorted view is a plain walk instead of a sort per view.
+    # Entries are (key, sequence) pairs: the sequence number is given on first add and breaks ties,
+    # so equal keys keep catalog order like sorted() did. A changed key is one bisect out, one bisect in.
+    def __init__(self, key):
+        self.key = key
+        self.entries = []  # (key, sequence), sorted
+        self.products = []  # products[i] belongs to entries[i]
+        self.current = {}  # id(product) -> its entry
+        self._next_sequence = 0
+
+    def build(self, products):  # Replaces the contents with one sort
+        self.current = {}
+        pairs = []
+        for product in products:
+            entry = (self.key(product), self._next_sequence)
+            self._next_sequence += 1
+            self.current[id(product)] = entry
+            pairs.append((entry, product))
+        pairs.sort(key=lambda pair: pair[0])
+        self.entries = [entry for entry, _ in pairs]
+        self.products = [product for _, product in pairs]
+
+    def add(self, product):
+        entry = (self.key(product), self._next_sequence)
+        self._next_sequence += 1
+        self._insert(entry, product)
+
+    def remove(self, product):
+        entry = self.current.pop(id(product), None)
+        if entry is not None:
+            i = bisect_left(self.entries, entry)
+            del self.entries[i]
+            del self.products[i]
+
+    def update(self, product):  # Call after product's key may have changed
+        entry = self.current.get(id(product))
+        if entry is None:
+            return self.add(product)
+        key = self.key(product)
+        if key != entry[0]:
+            self.remove(product)
+            self._insert((key, entry[1]), product)  # Keeps its sequence, so its place among equal keys too
+
+    def between(self, low, high):  # Products with low <= key <= high, in key order
+        start = bisect_left(self.entries, (low,))  # (low,) sorts before every (low, sequence)
+        end = bisect_left(self.entries, (high, self._next_sequence))  # and this after every (high, sequence)
+        return self.products[start:end]
+
+    def _insert(self, entry, product):
+        i = bisect_right(self.entries, entry)
+        self.entries.insert(i, entry)
+        self.products.insert(i, product)
+        self.current[id(product)] = entry
+
+    def __iter__(self):
+        return iter(self.products)
+
+    def __len__(self):
+        return len(self.products)
+
+    def __str__(self):
+        return f"SortedIndex({len(self.products)} products)"
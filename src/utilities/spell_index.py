@@ -0,0 +1,108 @@
+import sys
+import time
+from itertools import combinations
+
+def edit_distance(a: str, b: str, max_distance: int):  # Optimal string alignment distance, a swap of two letters counts once
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    previous_previous = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        row = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            row[j] = min(row[j - 1] + 1, previous[j] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                row[j] = min(row[j], previous_previous[j - 2] + 1)
+        if min(row) > max_distance:
+            return max_distance + 1
+        previous_previous, previous = previous, row
+    return previous[-1]
+
+class SymmetricDeleteIndex:
+    # SymSpell-style "did you mean" index: every name is stored under each string obtained by deleting
+    # up to max_distance of its characters. A misspelled query shares a delete variant with every name
+    # within max_distance edits of it, so a correction costs a few dict lookups instead of a scan.
+    # Like SymSpell only the first prefix_length characters are expanded, which bounds the variants
+    # of long names; candidates are always checked against the full name.
+    def __init__(self, max_distance: int = 2, prefix_length: int = 7):
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self.variants = {}  # delete variant -> set of lowercase names
+        self.products = {}  # lowercase name -> products with that name
+        self.build_seconds = 0.0
+
+    def build(self, products):  # Bulk indexing at load time, timed for report()
+        start = time.perf_counter()
+        for product in products:
+            self.add(product)
+        self.build_seconds = time.perf_counter() - start
+
+    def add(self, product):
+        name = product.name.lower()
+        if name in self.products:  # Variants are already there, just remember the extra product
+            self.products[name].append(product)
+            return
+        self.products[name] = [product]
+        for variant in self._deletes(name[:self.prefix_length], self.max_distance):
+            self.variants.setdefault(variant, set()).add(name)
+
+    def remove(self, product, name: str = None):  # name defaults to the product's current name
+        name = (name if name is not None else product.name).lower()
+        products = self.products.get(name)
+        if not products or product not in products:
+            return
+        products.remove(product)
+        if products:
+            return
+        del self.products[name]
+        for variant in self._deletes(name[:self.prefix_length], self.max_distance):
+            names = self.variants.get(variant)
+            if names is not None:
+                names.discard(name)
+                if not names:
+                    del self.variants[variant]
+
+    def lookup(self, query: str, max_distance: int = None):  # Products closest to query, best first
+        if max_distance is None or max_distance > self.max_distance:
+            max_distance = self.max_distance
+        query = query.strip().lower()
+        if not query:
+            return []
+
+        candidates = set()
+        for variant in self._deletes(query[:self.prefix_length], max_distance):
+            candidates.update(self.variants.get(variant, ()))
+
+        ranked = []
+        for name in candidates:
+            distance = edit_distance(query, name, max_distance)
+            if distance <= max_distance:
+                ranked.append((distance, name))
+        ranked.sort()
+        return [product for _, name in ranked for product in self.products[name]]
+
+    def _deletes(self, word: str, max_distance: int):  # word itself plus every way of removing 1..max_distance characters
+        variants = {word}
+        for count in range(1, min(max_distance, len(word)) + 1):
+            for removed in combinations(range(len(word)), count):
+                variants.add("".join(char for i, char in enumerate(word) if i not in removed))
+        return variants
+
+    def report(self):  # Size and build cost of the index, memory is a shallow estimate of the containers
+        memory = sys.getsizeof(self.variants) + sys.getsizeof(self.products)
+        for variant, names in self.variants.items():
+            memory += sys.getsizeof(variant) + sys.getsizeof(names)
+        for products in self.products.values():
+            memory += sys.getsizeof(products)
+        return {
+            "names": len(self.products),
+            "variants": len(self.variants),
+            "memory_bytes": memory,
+            "build_seconds": self.build_seconds,
+        }
+
+    def __str__(self):
+        report = self.report()
+        return (f"SymmetricDeleteIndex(names={report['names']}, variants={report['variants']}, "
+                f"~{report['memory_bytes'] / 1e6:.1f} MB, built in {report['build_seconds'] * 1000:.0f} ms)")
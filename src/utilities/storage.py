@@ -0,0 +1,275 @@
+import json
+import os
+import re
+import sqlite3
+import sys
+from datetime import datetime
+from utilities.binary_catalog import pack_catalog, read_catalog, read_metadata
+
+# Storage backends behind InventoryManager. All load and save product rows in the Product.to_dict() format.
+# JsonStorage keeps the catalog in one document and can only rewrite it whole (save_all).
+# BinaryStorage does the same with the compact binary_catalog format, loaded with a single read.
+# SqliteStorage keeps one row per product, so a sale is a single-row UPDATE (row_updates = True).
+
+def write_json_atomic(path: str, data):  # Readers and crashes see the old file or the new one, never half of it
+    temp_path = path + ".tmp"
+    with open(temp_path, "w") as f:
+        json.dump(data, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+def write_bytes_atomic(path: str, data: bytes):  # write_json_atomic for an already encoded file
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+def updated_metadata(metadata: dict, rows):  # The metadata every backend stamps on a full save
+    metadata["total_products"] = len(rows)  # Total size of products
+    metadata["last_updated"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")  # Date saved
+    return metadata
+
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+SEPARATOR = re.compile(r"[ \t\n\r]*([,\]])[ \t\n\r]*")  # Between two rows, or after the last one
+
+class JsonProductStream:
+    # Yields the rows of {"products": [{...}, {...}], ...} one at a time, decoding over chunk_size reads so
+    # the whole document, parsed or not, is never in memory at once. Other top-level values are decoded
+    # and dropped, they are small (metadata). progress(fraction) is called before every read but the first, once
+    # the rows of the chunks read so far have been handed out, so a caller counting them sees the right total.
+    def __init__(self, path: str, chunk_size: int = 1 << 16, progress=None):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.progress = progress
+        self.decoder = json.JSONDecoder()
+
+    def __iter__(self):
+        self._size = max(os.path.getsize(self.path), 1)
+        self._read = 0
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+        with open(self.path, 'r') as f:  # Open JSON file in read only mode
+            self._file = f
+            self._expect("{")
+            if self._peek() == "}":
+                return
+            while True:
+                key = self._value()
+                self._expect(":")
+                if key == "products":
+                    yield from self._products()
+                else:
+                    self._value()
+                if self._expect(",}") == "}":
+                    return
+
+    def _products(self):
+        self._expect("[")
+        if self._peek() == "]":
+            self._pos += 1
+            return
+        decode = self.decoder.scan_once  # raw_decode without the wrapper, StopIteration when nothing starts at pos
+        separator = SEPARATOR.match
+        whitespace = WHITESPACE.match
+        while True:
+            # Fast path: the row and the separator after it are both in the buffer
+            try:
+                row, end = decode(self._buffer, whitespace(self._buffer, self._pos).end())
+                found = separator(self._buffer, end)
+            except (json.JSONDecodeError, StopIteration):
+                found = None
+            if found is not None:
+                self._pos = found.end()
+                yield row
+                if found.group(1) == "]":
+                    return
+                continue
+            yield self._value()
+            if self._expect(",]") == "]":
+                return
+
+    def _fill(self):  # Drops what was decoded and appends the next chunk
+        if self.progress is not None and self._read:
+            self.progress(min(self._read / self._size, 1.0))
+        chunk = self._file.read(self.chunk_size)
+        self._eof = not chunk
+        self._read += len(chunk)
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+
+    def _peek(self):  # Next non-whitespace character, "" at the end of the file
+        while True:
+            self._pos = WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer) or self._eof:
+                return self._buffer[self._pos:self._pos + 1]
+            self._fill()
+
+    def _expect(self, characters: str):
+        found = self._peek()
+        if not found or found not in characters:
+            raise ValueError(f"Expected one of {characters!r} in {self.path}, found {found!r}")
+        self._pos += 1
+        return found
+
+    def _value(self):
+        self._peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+                self._fill()  # The value runs past the buffer
+                continue
+            if end == len(self._buffer) and not self._eof:  # A number might go on in the next chunk
+                self._fill()
+                continue
+            self._pos = end
+            return value
+
+class JsonStorage:
+    row_updates = False
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def load(self, progress=None):  # Product rows in catalog order, streamed
+        return iter(JsonProductStream(self.path, progress=progress))
+
+    def save_all(self, rows):
+        # First read the existing data, so keys other than the products survive
+        data = {}
+        if os.path.exists(self.path):
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+
+        # Update the data
+        data["products"] = rows
+        data["metadata"] = updated_metadata(data.get("metadata", {}), rows)
+
+        # Then write the updated data next to the old file and swap it in
+        write_json_atomic(self.path, data)
+
+    def close(self):
+        pass
+
+    def __str__(self):
+        return f"JsonStorage({self.path})"
+
+
+class BinaryStorage:
+    row_updates = False
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def load(self, progress=None):
+        return read_catalog(self.path, progress)
+
+    def save_all(self, rows):
+        metadata = read_metadata(self.path) if os.path.exists(self.path) else {}
+        write_bytes_atomic(self.path, pack_catalog(rows, updated_metadata(metadata, rows)))
+
+    def close(self):
+        pass
+
+    def __str__(self):
+        return f"BinaryStorage({self.path})"
+
+
+FIELD_COLUMNS = {"quantity": "quantity_in_stock"}  # Product attributes stored under another name
+
+COLUMNS = ("product_id", "name", "category", "quantity_in_stock", "unit_price", "expiry_date", "supplier")
+
+class SqliteStorage:
+    row_updates = True
+
+    def __init__(self, path: str):
+        self.path = path
+        # Autocommit: every statement is its own transaction unless save_all opens one
+        self.connection = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")  # Readers (reports, another till) don't block the writer
+        self.connection.execute("PRAGMA synchronous=NORMAL")  # WAL mode stays crash-safe with fewer fsyncs
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS products (
+                position INTEGER PRIMARY KEY,  -- Keeps catalog order
+                product_id TEXT NOT NULL UNIQUE,  -- UNIQUE is the product_id index
+                name TEXT NOT NULL,
+                category TEXT NOT NULL DEFAULT '',
+                quantity_in_stock INTEGER NOT NULL,
+                unit_price NOT NULL,  -- No declared type, so no affinity: 15900 stays an INTEGER and 159.5 a REAL
+                expiry_date TEXT NOT NULL,
+                supplier TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS products_name ON products (name COLLATE NOCASE);
+            CREATE INDEX IF NOT EXISTS products_expiry_date ON products (expiry_date);
+            CREATE INDEX IF NOT EXISTS products_category ON products (category);
+        """)
+
+    def load(self, progress=None):  # Rows are fetched as they are consumed
+        total = self.connection.execute("SELECT COUNT(*) FROM products").fetchone()[0]
+        cursor = self.connection.execute(f"SELECT {', '.join(COLUMNS)} FROM products ORDER BY position")
+        for loaded, row in enumerate(cursor, 1):
+            yield dict(zip(COLUMNS, row))
+            if progress is not None and loaded % 10_000 == 0:  # After the yield, the caller has the row by now
+                progress(loaded / total)
+        if progress is not None:
+            progress(1.0)
+
+    def save_all(self, rows):  # Replaces every row in one transaction
+        with self.connection:
+            self.connection.execute("BEGIN")
+            self.connection.execute("DELETE FROM products")
+            self.connection.executemany(
+                f"INSERT INTO products ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+                ([row[column] for column in COLUMNS] for row in rows))
+
+    def insert(self, row):
+        self.connection.execute(
+            f"INSERT INTO products ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+            [row[column] for column in COLUMNS])
+
+    def update(self, product_id: str, fields):  # fields: column -> new value, only those columns are written
+        assignments = ", ".join(f"{column} = ?" for column in fields)
+        self.connection.execute(f"UPDATE products SET {assignments} WHERE product_id = ?",
+                                [*fields.values(), product_id])
+
+    def delete(self, product_id: str):
+        self.connection.execute("DELETE FROM products WHERE product_id = ?", (product_id,))
+
+    def close(self):
+        self.connection.close()
+
+    def __str__(self):
+        return f"SqliteStorage({self.path})"
+
+
+BACKENDS = {".db": SqliteStorage, ".sqlite": SqliteStorage, ".invc": BinaryStorage}
+
+def storage_for(path: str):  # Backend picked by file extension, JSON for anything else
+    return BACKENDS.get(os.path.splitext(path)[1].lower(), JsonStorage)(path)
+
+def copy_catalog(source, target):  # Every row of one backend into another, returns the product count
+    try:
+        rows = list(source.load())
+        target.save_all(rows)
+    finally:
+        source.close()
+        target.close()
+    return len(rows)
+
+def convert(source_path: str, target_path: str):  # One-shot conversion, formats picked by extension
+    return copy_catalog(storage_for(source_path), storage_for(target_path))
+
+def migrate_json_to_sqlite(json_path: str, db_path: str):  # One-shot copy of a JSON catalog, returns the product count
+    return copy_catalog(JsonStorage(json_path), SqliteStorage(db_path))
+
+if __name__ == "__main__":
+    # Run from src/: python -m utilities.storage SOURCE TARGET, formats by extension: .json, .invc (binary), .db (SQLite)
+    #   python -m utilities.storage data/stock.json data/stock.invc
+    source, target = sys.argv[1:3]
+    print(f"✓ Converted {convert(source, target)} products from {source} to {target}")
@@ -1,49 +1,198 @@
+import heapq
+from itertools import islice
+from operator import itemgetter
+
 class TrieNode:
     def __init__(self):
         self.children = {}
         self.is_end_of_word = False
-        self.product = None
-        
+        self.products = []  # Every product with this exact (lowercase) name
+        self.top_k = {}  # rank_by -> best (key, product) pairs of this subtree, filled lazily
+
 class Trie:
-    def __init__(self):
+    RANKINGS = ("name", "stock", "popularity")
+
+    def __init__(self, cache_size: int = 20):
         self.root = TrieNode()
-    
-    def insert(self, product):  # Inserting a product in the Trie
+        self.cache_size = cache_size  # How many ranked products every node keeps in its top_k cache
+        self.popularity = {}  # product_id -> units sold, used by rank_by="popularity"
+
+    def insert(self, product, name: str = None):  # Inserting a product in the Trie, name defaults to its current name
         node = self.root
-        word = product.name.lower()
-        
+        word = (product.name if name is None else name).lower()
+        node.top_k.clear()
+
         for char in word:
             if char not in node.children:
                 node.children[char] = TrieNode()
             node = node.children[char]
-        
+            node.top_k.clear()  # Every node on the path now has a new product in its subtree
+
         node.is_end_of_word = True
-        node.product = product
-        
-    def search_prefix(self, prefix: str):  # Searching for a product in a Trie based on a prefix
+        if product not in node.products:
+            node.products.append(product)
+
+    def remove(self, product, name: str = None):  # Removing a product, name defaults to its current name
+        word = (name if name is not None else product.name).lower()
+        path = [self.root]
+        for char in word:
+            node = path[-1].children.get(char)
+            if node is None:
+                return False
+            path.append(node)
+
+        node = path[-1]
+        if product not in node.products:  # The name belongs to other products (or nobody)
+            return False
+        node.products.remove(product)
+        node.is_end_of_word = bool(node.products)
+
+        for node in path:
+            node.top_k.clear()
+        # Prune the branch bottom-up until a node still leads to another name
+        for depth in range(len(word), 0, -1):
+            node = path[depth]
+            if node.children or node.is_end_of_word:
+                break
+            del path[depth - 1].children[word[depth - 1]]
+        return True
+
+    def rename(self, product, old_name: str):  # Moving a product whose name already changed to its new path
+        self.remove(product, old_name)
+        self.insert(product)
+
+    def refresh(self, product):  # Drop cached rankings on the product's path after its stock changed
         node = self.root
-        prefix_lower = prefix.lower()
-        
-        # Navigate to prefix node
-        for char in prefix_lower:
-            if char not in node.children:
-                return []
-            node = node.children[char]
-        
-        # Collect all products with the current prefix
-        return self._collect_products(node)
-    
-    def _collect_products(self, node, products=None):  # Collecting products starting with the suggested prefix
-        if products is None:
-            products = []
-            
-        if node.is_end_of_word and node.product:
-            products.append(node.product)
-            
-        for child in node.children.values():
-            self._collect_products(child, products)
-            
-        return products
-    
+        node.top_k.clear()
+        for char in product.name.lower():
+            node = node.children.get(char)
+            if node is None:
+                return
+            node.top_k.clear()
+
+    def record_sale(self, product, quantity: int):  # Counting units sold for the popularity ranking
+        self.popularity[product.product_id] = self.popularity.get(product.product_id, 0) + quantity
+        self.refresh(product)
+
+    def search_prefix(self, prefix: str, limit: int = None, rank_by: str = "name"):  # Searching for a product in a Trie based on a prefix
+        if rank_by not in self.RANKINGS:
+            raise ValueError(f"Unknown ranking '{rank_by}', expected one of {self.RANKINGS}")
+
+        node = self._find_node(prefix)
+        if node is None:
+            return []
+
+        if limit is None:
+            # Collect all products with the current prefix, already in name order
+            products = self._collect_products(node)
+            if rank_by != "name":
+                products.sort(key=lambda p: self._rank_key(p, rank_by))
+            return products
+        if rank_by == "name":
+            # Lexicographic walk already yields products in name order, stop after limit of them
+            return list(islice(self._iter_subtree(node), limit))
+        if limit > self.cache_size:
+            # Bigger than what the nodes cache, rank the whole subtree once
+            return heapq.nsmallest(limit, self._collect_products(node), key=lambda p: self._rank_key(p, rank_by))
+        return [product for _, product in self._top_k(node, rank_by)[:limit]]
+
+    def search_fuzzy(self, query: str, max_distance: int = 1, limit: int = None, prefix: bool = False):
+        # Products whose name is within max_distance edits of query, closest first.
+        # One Levenshtein DP row is computed per trie node and shared by its whole subtree,
+        # so a branch is dropped as soon as every cell of its row exceeds max_distance.
+        # With prefix=True the query only has to match the beginning of a name (autocomplete with typos).
+        query = query.lower()
+        first_row = list(range(len(query) + 1))
+        matches = []  # (distance, lowercase name, product)
+
+        stack = [(child, char, first_row, first_row[-1]) for char, child in self.root.children.items()]
+        pop = stack.pop
+        while stack:
+            node, char, previous_row, best = pop()
+            left = previous_row[0] + 1
+            row = [left]
+            for query_char, diagonal, above in zip(query, previous_row, previous_row[1:]):
+                # Inlined min(substitute, delete, insert), this loop is the hot path
+                value = diagonal if query_char == char else diagonal + 1
+                if above < value:
+                    value = above + 1
+                if left < value:
+                    value = left + 1
+                row.append(value)
+                left = value
+            if left < best:
+                best = left  # Closest any prefix on this path came to the whole query
+
+            if node.is_end_of_word:
+                distance = best if prefix else left
+                if distance <= max_distance:
+                    matches.extend((distance, product.name.lower(), product) for product in node.products)
+
+            if min(row) <= max_distance:
+                if node.children:
+                    stack.extend([(child, next_char, row, best) for next_char, child in node.children.items()])
+            elif prefix and best <= max_distance:
+                # No descendant can get closer, they all match through this prefix
+                for child in node.children.values():
+                    matches.extend((best, product.name.lower(), product) for product in self._iter_subtree(child))
+
+        matches.sort(key=lambda match: match[:2])
+        return [product for _, _, product in matches[:limit]]
+
+    def iter_prefix(self, prefix: str):  # Lazily yields products starting with prefix in lexicographic order
+        node = self._find_node(prefix)
+        if node is None:
+            return iter(())
+        return self._iter_subtree(node)
+
+    def _find_node(self, prefix: str):  # Navigate to prefix node, None when no name starts with it
+        node = self.root
+        for char in prefix.lower():
+            node = node.children.get(char)
+            if node is None:
+                return None
+        return node
+
+    def _iter_subtree(self, node):  # Pre-order walk with an explicit stack, children visited in sorted order
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            if current.is_end_of_word:
+                yield from current.products
+            children = current.children
+            if children:
+                stack.extend(children[char] for char in sorted(children, reverse=True))
+
+    def _rank_key(self, product, rank_by: str):  # Smaller keys rank first, ties are broken by name
+        name = product.name.lower()
+        if rank_by == "stock":
+            return (-product.quantity, name)
+        if rank_by == "popularity":
+            return (-self.popularity.get(product.product_id, 0), name)
+        return (name,)
+
+    def _top_k(self, node, rank_by: str):  # Best cache_size products under node, merged from the children's caches
+        stack = [(node, False)]
+        while stack:  # Post-order fill of the nodes missing a cache, without recursion
+            current, expanded = stack.pop()
+            if rank_by in current.top_k:
+                continue
+            if not expanded:
+                stack.append((current, True))
+                stack.extend((child, False) for child in current.children.values() if rank_by not in child.top_k)
+                continue
+
+            candidates = []
+            if current.is_end_of_word:
+                candidates.extend((self._rank_key(product, rank_by), product) for product in current.products)
+            for child in current.children.values():
+                candidates.extend(child.top_k[rank_by])
+            current.top_k[rank_by] = heapq.nsmallest(self.cache_size, candidates, key=itemgetter(0))
+
+        return node.top_k[rank_by]
+
+    def _collect_products(self, node):  # Collecting products starting with the suggested prefix
+        return list(self._iter_subtree(node))
+
     def __str__(self):
-        return f"Trie(root with {len(self.root.children)} children)"
\ No newline at end of file
+        return f"Trie(root with {len(self.root.children)} children)"
@@ -0,0 +1,130 @@
+import json
+import os
+import threading
+import time
+
+class WriteAheadLog:
+    # Append-only journal of stock and price changes, one compact JSON object per line.
+    # Each append reaches the OS right away, so a crashed process loses nothing. fsync, which is what survives
+    # a power cut, is batched and runs on the log's own thread, never in the caller of append(): once
+    # sync_every records are waiting, or sync_interval seconds after the oldest of them, whichever comes first.
+    # Records hold absolute values ({"id": "P001", "quantity": 12}), so replaying one twice is harmless.
+    # A checkpoint that runs while changes keep coming rotates the log first: records up to the rotation
+    # move to path + ".old", which is deleted once the checkpoint is on disk, and new records start a fresh log.
+    def __init__(self, path: str, sync_every: int = 32, sync_interval: float = 1.0):
+        self.path = path
+        self.rotated_path = path + ".old"
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self.records = 0  # Records in the log, replayed or appended since the last checkpoint
+        self.syncs = 0  # fsync calls made
+        self._file = None  # Opened on first append
+        self._unsynced = 0
+        self._first_unsynced = None  # When the oldest record not yet synced was appended
+        self._state = threading.Condition()  # Guards the file and the counters, wakes the sync thread
+        self._closing = False
+        self._thread = None  # Started on first append
+
+    def append(self, record: dict):
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        with self._state:
+            if self._file is None:
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(line)
+            self._file.flush()
+            self.records += 1
+            self._unsynced += 1
+            if self._unsynced == 1:
+                self._first_unsynced = time.monotonic()
+            if self._thread is None or not self._thread.is_alive():
+                self._closing = False
+                self._thread = threading.Thread(target=self._run, name="wal-sync", daemon=True)
+                self._thread.start()
+            if self._unsynced == 1 or self._unsynced >= self.sync_every:
+                self._state.notify_all()
+
+    def sync(self):  # Forces every appended record to disk, appends don't wait for the fsync
+        with self._state:
+            if self._file is None or not self._unsynced:
+                return
+            fd = os.dup(self._file.fileno())  # Stays valid if the log is rotated or closed meanwhile
+            self._unsynced = 0
+            self._first_unsynced = None
+        try:
+            os.fsync(fd)
+            self.syncs += 1
+        finally:
+            os.close(fd)
+
+    def _run(self):  # The sync thread, ends when the log is closed
+        while True:
+            with self._state:
+                self._state.wait_for(lambda: self._unsynced or self._closing)
+                while self._unsynced and self._unsynced < self.sync_every and not self._closing:
+                    wait = self._first_unsynced + self.sync_interval - time.monotonic()
+                    if wait <= 0:
+                        break
+                    self._state.wait(wait)
+                if self._closing:
+                    return
+            self.sync()
+
+    def replay(self):  # Records in the order they were written, a half-written last line is ignored
+        self.records = 0
+        for path in (self.rotated_path, self.path):  # A rotated log means a checkpoint never finished
+            if not os.path.exists(path):
+                continue
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        break  # Torn tail of a crash, nothing after it was acknowledged
+                    self.records += 1
+                    yield record
+
+    def rotate(self):  # Sets the records so far aside for a checkpoint, later appends go to a fresh log
+        # No fsync here, callers hold the inventory lock: sync_rotated() does it once they let go
+        with self._state:
+            self._close_file()
+            if not os.path.exists(self.path):
+                return
+            if os.path.exists(self.rotated_path):  # The previous checkpoint failed, keep its records too
+                with open(self.path, "rb") as f, open(self.rotated_path, "ab") as old:
+                    old.write(f.read())
+                    os.fsync(old.fileno())
+                os.remove(self.path)
+            else:
+                os.replace(self.path, self.rotated_path)
+            self.records = 0
+
+    def sync_rotated(self):  # Forces the records set aside by rotate() to disk
+        if os.path.exists(self.rotated_path):
+            with open(self.rotated_path, "rb") as f:
+                os.fsync(f.fileno())
+
+    def discard_rotated(self):  # The checkpoint holding the rotated records is safely on disk
+        if os.path.exists(self.rotated_path):
+            os.remove(self.rotated_path)
+
+    def close(self):  # Syncs what is left and stops the sync thread
+        self.sync()
+        with self._state:
+            self._close_file()
+            self._closing = True
+            self._state.notify_all()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._unsynced = 0
+            self._first_unsynced = None
+
+    def __len__(self):
+        return self.records
+
+    def __str__(self):
+        return f"WriteAheadLog({self.path}, {self.records} records, {self._unsynced} not synced, {self.syncs} syncs)"